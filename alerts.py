@@ -0,0 +1,177 @@
+import json
+import os
+import time
+from bisect import bisect_left, bisect_right
+from collections import deque
+
+# Price alerts, checked incrementally on every ticker update.
+# alerts.json:
+#   {"hook": "/home/pi/alert.sh",
+#    "alerts": [{"symbol": "btc", "above": 70000},
+#               {"symbol": "eth", "below": 3000},
+#               {"symbol": "sol", "move": 5, "window": 900}]}
+# Levels are in the USDT quote; "move" is a % change in either direction
+# within "window" seconds.
+
+# VARIABLES
+BASE_PATH = os.path.dirname(os.path.realpath(__file__))
+ALERTS_FILE = os.environ.get('CRYPTODASH_ALERTS', os.path.join(BASE_PATH, "alerts.json"))
+DEBOUNCE = 300  # Seconds before the same alert can fire again
+DEFAULT_WINDOW = 3600  # Seconds, for move alerts without a window
+
+class Alert:
+    def __init__(self, token_id, kind, value, window=None, label=None):
+        self.token_id = token_id.lower()
+        self.kind = kind  # 'above', 'below' or 'move'
+        self.value = float(value)
+        self.window = window
+        self.label = label
+        self.last_fired = None
+
+    def message(self, price, move=None):
+        name = self.label or self.token_id.upper()
+        if self.kind == 'move':
+            return f'{name} moved {move:+.2f}% in {self.window // 60} min ({price:,.2f} $)'
+        return f'{name} {self.kind} {self.value:,.2f} $ ({price:,.2f} $)'
+
+    def to_dict(self):
+        return {'symbol': self.token_id, 'kind': self.kind, 'value': self.value, 'window': self.window}
+
+def load_alerts(path=ALERTS_FILE):
+    """Returns ([Alert, ...], hook command or None); no file means no alerts."""
+    if not os.path.exists(path):
+        return [], None
+    try:
+        with open(path, 'r') as f:
+            config = json.load(f)
+        alerts = []
+        for entry in config.get('alerts', []):
+            for kind in ('above', 'below', 'move'):
+                if kind in entry:
+                    window = int(entry.get('window', DEFAULT_WINDOW)) if kind == 'move' else None
+                    alerts.append(Alert(entry['symbol'], kind, entry[kind], window, entry.get('label')))
+    except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+        print(f"Error loading alerts: {e}")
+        return [], None
+    return alerts, config.get('hook')
+
+# Sorted thresholds for one symbol and direction
+class LevelIndex:
+    def __init__(self):
+        self.levels = []
+        self.alerts = []
+
+    def add(self, alert):
+        position = bisect_right(self.levels, alert.value)
+        self.levels.insert(position, alert.value)
+        self.alerts.insert(position, alert)
+
+    # Levels in (low, high]
+    def crossed_up(self, low, high):
+        return self.alerts[bisect_right(self.levels, low):bisect_right(self.levels, high)]
+
+    # Levels in [low, high)
+    def crossed_down(self, low, high):
+        return self.alerts[bisect_left(self.levels, low):bisect_left(self.levels, high)]
+
+# Sliding window min/max for one symbol and window length (monotonic queues)
+class MoveWindow:
+    def __init__(self, window):
+        self.window = window
+        self.min_queue = deque()
+        self.max_queue = deque()
+        self.thresholds = []
+        self.alerts = []
+
+    def add(self, alert):
+        position = bisect_right(self.thresholds, abs(alert.value))
+        self.thresholds.insert(position, abs(alert.value))
+        self.alerts.insert(position, alert)
+
+    def push(self, timestamp, price):
+        while self.min_queue and self.min_queue[-1][1] >= price:
+            self.min_queue.pop()
+        self.min_queue.append((timestamp, price))
+        while self.max_queue and self.max_queue[-1][1] <= price:
+            self.max_queue.pop()
+        self.max_queue.append((timestamp, price))
+        start = timestamp - self.window
+        while self.min_queue[0][0] < start:
+            self.min_queue.popleft()
+        while self.max_queue[0][0] < start:
+            self.max_queue.popleft()
+
+    # Largest % move into the current price within the window, with its sign
+    def move(self, price):
+        low = self.min_queue[0][1]
+        high = self.max_queue[0][1]
+        rise = (price - low) / low * 100 if low else 0.0
+        fall = (price - high) / high * 100 if high else 0.0
+        return rise if rise >= -fall else fall
+
+    def triggered(self, move):
+        return self.alerts[:bisect_right(self.thresholds, abs(move))]
+
+# Alert Engine
+class AlertEngine:
+    """Per-symbol sorted indexes: a tick only visits the alerts it actually crosses."""
+
+    def __init__(self, alerts=(), debounce=DEBOUNCE):
+        self.debounce = debounce
+        self.above = {}  # token_id -> LevelIndex
+        self.below = {}
+        self.moves = {}  # token_id -> {window: MoveWindow}
+        self.last_price = {}
+        self.count = 0
+        for alert in alerts:
+            self.add(alert)
+
+    def add(self, alert):
+        if alert.kind == 'move':
+            windows = self.moves.setdefault(alert.token_id, {})
+            if alert.window not in windows:
+                windows[alert.window] = MoveWindow(alert.window)
+            windows[alert.window].add(alert)
+        else:
+            index = self.above if alert.kind == 'above' else self.below
+            index.setdefault(alert.token_id, LevelIndex()).add(alert)
+        self.count += 1
+
+    def __len__(self):
+        return self.count
+
+    def symbols(self):
+        return set(self.above) | set(self.below) | set(self.moves)
+
+    def update(self, token_id, price, now=None):
+        """Feeds one price; returns [(alert, message), ...] that fired."""
+        now = time.time() if now is None else now
+        candidates = []
+        previous = self.last_price.get(token_id)
+        self.last_price[token_id] = price
+        if previous is not None and price != previous:
+            if price > previous and token_id in self.above:
+                candidates.extend((alert, None) for alert in self.above[token_id].crossed_up(previous, price))
+            elif price < previous and token_id in self.below:
+                candidates.extend((alert, None) for alert in self.below[token_id].crossed_down(price, previous))
+        for window in self.moves.get(token_id, {}).values():
+            window.push(now, price)
+            move = window.move(price)
+            candidates.extend((alert, move) for alert in window.triggered(move))
+
+        fired = []
+        for alert, move in candidates:
+            if alert.last_fired is not None and now - alert.last_fired < self.debounce:
+                continue
+            alert.last_fired = now
+            fired.append((alert, alert.message(price, move)))
+        return fired
+
+    def update_snapshot(self, snapshot, now=None):
+        now = time.time() if now is None else now
+        fired = []
+        for token_id, data in snapshot.items():
+            if data.get('price') and not data.get('stale'):
+                # Replayed tapes carry their own timestamps
+                fired.extend(self.update(token_id, data['price'], data.get('time', now)))
+        return fired
@@ -0,0 +1,156 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from PyQt5.QtGui import QGuiApplication, QPixmap
+from price_cache import CACHE_DIR, atomic_write
+
+# Pre-sized copies of the image assets (logos, thumbnails, backgrounds) on disk,
+# so later runs load ready-sized files instead of decoding and scaling sources.
+
+# VARIABLES
+VARIANT_DIR = os.path.join(CACHE_DIR, 'assets')
+ASSET_VARIANTS = os.environ.get('CRYPTODASH_ASSET_VARIANTS', '1') == '1'
+VARIANTS_PER_SOURCE = 6  # Sizes kept per source image, the oldest are removed first
+JPEG_QUALITY = 92
+SETTLE_DELAY = 2.0  # Seconds a size must stay requested before it is written (skips sizes passed while resizing)
+
+# Physical pixels per logical pixel (1.0 before the QApplication exists)
+def device_pixel_ratio():
+    app = QGuiApplication.instance()
+    return app.devicePixelRatio() if app is not None else 1.0
+
+# Asset Variants
+class AssetVariants:
+    """Scaled images keyed by source hash, pixel size and scaling modes.
+
+    A source is only re-hashed when its mtime or size changes; a new hash
+    means new variants, and the files of the old hash are removed. Variants
+    are encoded and written by a single background thread, once the size of
+    an image has settled.
+    """
+
+    def __init__(self, directory=VARIANT_DIR):
+        self.directory = directory
+        self.manifest_path = os.path.join(directory, 'sources.json')
+        self.sources = None  # path -> [mtime_ns, size, sha1]
+        self.manifest_dirty = False
+        self.lock = threading.Lock()
+        self.condition = threading.Condition(self.lock)
+        self.pending = {}  # (path, aspect, transform) -> (due time, image, variant path, digest)
+        self.writer = None
+
+    def load_manifest(self):
+        try:
+            with open(self.manifest_path, 'r') as f:
+                self.sources = json.load(f)
+        except (OSError, ValueError):
+            self.sources = {}
+
+    def source_hash(self, path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        with self.lock:
+            if self.sources is None:
+                self.load_manifest()
+            entry = self.sources.get(path)
+        if entry and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+            return entry[2]
+        with open(path, 'rb') as f:
+            digest = hashlib.sha1(f.read()).hexdigest()
+        with self.lock:
+            self.sources[path] = [stat.st_mtime_ns, stat.st_size, digest]
+            self.manifest_dirty = True
+        if entry and entry[2] != digest:
+            self.remove(entry[2])
+        return digest
+
+    def variant_path(self, path, digest, size, aspect, transform):
+        suffix = '.jpg' if path.lower().endswith(('.jpg', '.jpeg')) else '.png'
+        return os.path.join(self.directory, f'{digest[:20]}-{size[0]}x{size[1]}-{int(aspect)}{int(transform)}{suffix}')
+
+    # Ready-sized pixmap from disk, or None when the variant has to be generated
+    def load(self, path, size, aspect, transform):
+        digest = self.source_hash(path)
+        if digest is None:
+            return None
+        variant = self.variant_path(path, digest, size, aspect, transform)
+        if not os.path.exists(variant):
+            return None
+        pixmap = QPixmap(variant)
+        return pixmap if not pixmap.isNull() else None
+
+    def save(self, path, size, aspect, transform, pixmap):
+        digest = self.source_hash(path)
+        if digest is None or pixmap.isNull():
+            return
+        variant = self.variant_path(path, digest, size, aspect, transform)
+        # QPixmap stays on the GUI thread, the QImage copy can be encoded anywhere
+        image = pixmap.toImage()
+        with self.condition:
+            # A newer size of the same image replaces the queued one
+            self.pending[(path, int(aspect), int(transform))] = (time.monotonic() + SETTLE_DELAY, image, variant, digest)
+            if self.writer is None:
+                self.writer = threading.Thread(target=self.write_loop, daemon=True)
+                self.writer.start()
+            self.condition.notify()
+
+    def write_loop(self):
+        while True:
+            with self.condition:
+                while True:
+                    now = time.monotonic()
+                    due = [key for key, entry in self.pending.items() if entry[0] <= now]
+                    if due:
+                        break
+                    next_due = min((entry[0] for entry in self.pending.values()), default=None)
+                    self.condition.wait(None if next_due is None else next_due - now)
+                jobs = [self.pending.pop(key)[1:] for key in due]
+            for image, variant, digest in jobs:
+                self.write(image, variant, digest)
+
+    def write(self, image, variant, digest):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix='.tmp-', suffix=os.path.splitext(variant)[1])
+            os.close(fd)
+            if variant.endswith('.jpg'):
+                saved = image.save(tmp_path, 'JPG', JPEG_QUALITY)
+            else:
+                saved = image.save(tmp_path, 'PNG')
+            if not saved:
+                os.unlink(tmp_path)
+                print(f"Error writing asset variant {variant}")
+                return
+            os.replace(tmp_path, variant)
+            with self.lock:
+                self.prune(digest)
+                if self.manifest_dirty:
+                    atomic_write(self.manifest_path, json.dumps(self.sources, separators=(',', ':')))
+                    self.manifest_dirty = False
+        except OSError as e:
+            print(f"Error writing asset variant: {e}")
+
+    def files(self, digest):
+        prefix = f'{digest[:20]}-'
+        try:
+            return [os.path.join(self.directory, name) for name in os.listdir(self.directory) if name.startswith(prefix)]
+        except OSError:
+            return []
+
+    # Keep the newest VARIANTS_PER_SOURCE sizes of a source (e.g. backgrounds of old screens)
+    def prune(self, digest):
+        files = sorted(self.files(digest), key=os.path.getmtime, reverse=True)
+        for path in files[VARIANTS_PER_SOURCE:]:
+            os.unlink(path)
+
+    def remove(self, digest):
+        for path in self.files(digest):
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
@@ -0,0 +1,243 @@
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+# Headless benchmarks for the dashboard and the WiFi manager.
+# Runs on Qt's offscreen platform against fake_binance.ApiServer, writes the
+# results as JSON and, given a baseline, fails when something got slower.
+BASE_PATH = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, BASE_PATH)
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+os.environ.setdefault('XDG_RUNTIME_DIR', tempfile.mkdtemp(prefix='cryptodash-runtime-'))
+os.environ['CRYPTODASH_CACHE_DIR'] = tempfile.mkdtemp(prefix='cryptodash-bench-')
+os.environ['CRYPTODASH_DAEMON_SOCKET'] = os.path.join(os.environ['CRYPTODASH_CACHE_DIR'], 'no-daemon.sock')
+
+from PyQt5.QtWidgets import QApplication, QWidget
+from PyQt5.QtCore import QEventLoop, QT_VERSION_STR
+
+from fake_binance import ApiServer
+
+# VARIABLES
+DEFAULT_REPEAT = 20
+DEFAULT_THRESHOLD = 0.25  # Allowed slowdown versus the baseline (25 %)
+WAIT_TIMEOUT = 10
+RESIZE_SIZES = [(800, 480), (1024, 600), (1280, 720), (1920, 1080)]
+
+def peak_rss():
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def process_events(app):
+    app.processEvents(QEventLoop.AllEvents, 10)
+
+def wait_until(app, predicate, timeout=WAIT_TIMEOUT):
+    deadline = time.perf_counter() + timeout
+    while not predicate():
+        if time.perf_counter() > deadline:
+            raise TimeoutError('Benchmark step did not finish in time')
+        process_events(app)
+
+def summarize(samples):
+    samples = sorted(samples)
+    return {
+        'runs': len(samples),
+        'min_ms': samples[0] * 1000,
+        'median_ms': statistics.median(samples) * 1000,
+        'mean_ms': statistics.mean(samples) * 1000,
+        'p95_ms': samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000,
+    }
+
+def measure(function, repeat):
+    samples = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        function(i)
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+# WiFi backend that never finds anything (no radio needed)
+class IdleWiFi:
+    def start_scan(self):
+        return True
+
+    def scan_results(self):
+        return []
+
+    def status(self):
+        return False
+
+    def close(self):
+        pass
+
+# Benchmarks
+def close_dashboard(dashboard):
+    dashboard.stop_fetch()
+    dashboard.stop_wifi_helper()
+    dashboard.close()
+    dashboard.deleteLater()
+
+def bench_dashboard(app, repeat, low_power):
+    import crypto_dash
+    from crypto_dash import CryptoDashboard
+
+    results = {}
+
+    # Construction up to the first frame and the deferred startup work
+    def construct(i):
+        dashboard = CryptoDashboard(stream=False, low_power=low_power)
+        dashboard.show()
+        wait_until(app, lambda: dashboard.settings_panel is not None)
+        close_dashboard(dashboard)
+    results['construct'] = measure(construct, max(3, repeat // 4))
+
+    dashboard = CryptoDashboard(stream=False, low_power=low_power)
+    dashboard.show()
+    wait_until(app, lambda: dashboard.settings_panel is not None and dashboard.fetch_worker is None)
+
+    # Batched fetch against the fake API, through to the rendered labels
+    def update_data(i):
+        dashboard.update_data()
+        wait_until(app, lambda: dashboard.fetch_worker is None)
+    results['update_data'] = measure(update_data, repeat)
+
+    tokens = dashboard.token_config
+    def change_token(i):
+        token_name, token_id = tokens[i % len(tokens)]
+        dashboard.change_token(token_name, token_id)
+        process_events(app)
+    results['change_token'] = measure(change_token, repeat)
+    wait_until(app, lambda: dashboard.fetch_worker is None and dashboard.history_worker is None)
+
+    # New size every time (scale from the decoded image), then a repeated size (cache hit)
+    def resize_new(i):
+        dashboard.resize(820 + i * 7, 500 + i * 3)
+        process_events(app)
+    results['set_background_resize'] = measure(resize_new, repeat)
+
+    def resize_cached(i):
+        dashboard.resize(*RESIZE_SIZES[i % len(RESIZE_SIZES)])
+        process_events(app)
+    for size in RESIZE_SIZES:
+        dashboard.resize(*size)
+        process_events(app)
+    results['set_background_cached'] = measure(resize_cached, repeat)
+
+    def update_time(i):
+        for _ in range(100):
+            dashboard.update_time()
+        if low_power:
+            dashboard.flush_text()
+    results['update_time_x100'] = measure(update_time, repeat)
+
+    close_dashboard(dashboard)
+    process_events(app)
+    crypto_dash.image_cache.clear()
+    return results
+
+def bench_wifi_manager(app, repeat):
+    from network import WiFiManager
+
+    results = {}
+    parent = QWidget()
+    parent.resize(800, 480)
+    manager = WiFiManager(parent=parent, backend=IdleWiFi())
+    manager.setGeometry(parent.rect())
+    parent.show()
+    process_events(app)
+
+    # Full repaint of the panel (background, list, buttons, keyboard)
+    results['wifi_paint'] = measure(lambda i: manager.repaint(), repeat)
+
+    # Switching the keyboard layout (replaces the old per-toggle load_keys rebuild)
+    def toggle_layout(i):
+        manager.keyboard.toggle_special_chars()
+        process_events(app)
+    results['keyboard_toggle'] = measure(toggle_layout, repeat)
+
+    def toggle_caps(i):
+        manager.keyboard.toggle_caps_lock()
+        process_events(app)
+    results['keyboard_caps'] = measure(toggle_caps, repeat)
+
+    manager.stop_scan()
+    parent.close()
+    parent.deleteLater()
+    process_events(app)
+    return results
+
+def run(repeat, low_power):
+    api = ApiServer(('127.0.0.1', 0), seed=1).start()
+    import binance_client
+    binance_client.client.base_url = api.url
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    start_rss = peak_rss()
+    started = time.time()
+    # The app prints on every update; keep stdout for the results
+    with redirect_stdout(sys.stderr):
+        results = bench_dashboard(app, repeat, low_power)
+        results.update(bench_wifi_manager(app, repeat))
+    api.shutdown()
+    return {
+        'time': started,
+        'duration_s': time.time() - started,
+        'python': platform.python_version(),
+        'qt': QT_VERSION_STR,
+        'machine': platform.machine(),
+        'platform': os.environ['QT_QPA_PLATFORM'],
+        'low_power': low_power,
+        'repeat': repeat,
+        'peak_rss_bytes': peak_rss(),
+        'peak_rss_start_bytes': start_rss,
+        'results': results,
+    }
+
+# Regression Check (median times and peak RSS)
+def compare(report, baseline, threshold):
+    regressions = []
+    for name, result in report['results'].items():
+        previous = baseline.get('results', {}).get(name)
+        if previous is None:
+            continue
+        if result['median_ms'] > previous['median_ms'] * (1 + threshold):
+            regressions.append(f"{name}: {result['median_ms']:.2f} ms vs {previous['median_ms']:.2f} ms")
+    previous_rss = baseline.get('peak_rss_bytes')
+    if previous_rss and report['peak_rss_bytes'] > previous_rss * (1 + threshold):
+        regressions.append(f"peak RSS: {report['peak_rss_bytes'] / 2**20:.1f} MiB vs {previous_rss / 2**20:.1f} MiB")
+    return regressions
+
+# Main
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Crypto Dashboard headless benchmarks')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help='Runs per benchmark')
+    parser.add_argument('--low-power', action='store_true', help='Benchmark the low power render mode')
+    parser.add_argument('--output', help='Write the JSON results to this file (default: stdout)')
+    parser.add_argument('--baseline', help='Previous results to compare against')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help='Allowed slowdown, e.g. 0.25 = 25%%')
+    args = parser.parse_args()
+
+    report = run(args.repeat, args.low_power)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+    for name, result in report['results'].items():
+        print(f"{name:24} median {result['median_ms']:8.2f} ms  p95 {result['p95_ms']:8.2f} ms", file=sys.stderr)
+    print(f"{'peak RSS':24} {report['peak_rss_bytes'] / 2**20:.1f} MiB", file=sys.stderr)
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,239 @@
+import json
+import os
+import random
+import threading
+import time
+from metrics import metrics
+
+# VARIABLES
+API_URL = os.environ.get('CRYPTODASH_API_URL', 'https://api.binance.com')
+QUOTE_ASSET = 'USDT'
+CONNECT_TIMEOUT = 3.05
+READ_TIMEOUT = 10
+MAX_RETRIES = 4
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30
+WEIGHT_LIMIT = 6000  # Request weight allowed per minute (REQUEST_WEIGHT 1m)
+WEIGHT_SAFETY = 0.8  # Throttle once this fraction of the limit is used
+RETRY_STATUS = (418, 429, 500, 502, 503, 504)
+MAX_THROTTLE_WAIT = 5  # Seconds a request may wait for the rate limit, longer blocks fail right away
+
+INVALID_SYMBOL = -1121  # Binance error code for unknown / delisted symbols
+MAX_SYMBOLS = 100  # Symbols per ticker request (Binance limit of the symbols parameter)
+
+class BinanceError(Exception):
+    def __init__(self, message, status=None, code=None):
+        super().__init__(message)
+        self.status = status  # HTTP status, when Binance answered
+        self.code = code  # Binance error code from the response body
+
+# Shared HTTP Client
+class BinanceClient:
+    """Pooled keep-alive session with timeouts, backoff retries and weight throttling."""
+
+    def __init__(self, base_url=API_URL, pool_size=4, weight_limit=WEIGHT_LIMIT):
+        self.base_url = base_url
+        self.weight_limit = weight_limit
+        self.used_weight = 0
+        self.weight_window = self._minute()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+        self.closing = threading.Event()  # Set on shutdown, interrupts throttle / backoff sleeps
+        self.pool_size = pool_size
+        self._session = None
+
+    # requests is imported on first use to keep it off the startup path
+    @property
+    def session(self):
+        if self._session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size, max_retries=0)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            session.headers.update({'Connection': 'keep-alive'})
+            self._session = session
+        return self._session
+
+    def _minute(self):
+        return int(time.time() // 60)
+
+    # Wait until Binance allows more requests; bans (418) and long limits fail fast until they end
+    def throttle(self):
+        with self.lock:
+            if self._minute() != self.weight_window:
+                self.weight_window = self._minute()
+                self.used_weight = 0
+            wait = self.blocked_until - time.time()
+            if self.used_weight >= self.weight_limit * WEIGHT_SAFETY:
+                wait = max(wait, (self.weight_window + 1) * 60 - time.time())
+        if wait > MAX_THROTTLE_WAIT:
+            until = time.strftime('%H:%M:%S', time.localtime(time.time() + wait))
+            raise BinanceError(f"Rate limited by Binance until {until}", 429)
+        if wait > 0:
+            print(f"Binance rate limit: waiting {wait:.1f}s")
+            self.sleep(wait)
+
+    def sleep(self, seconds):
+        if self.closing.wait(seconds):
+            raise BinanceError("Client shut down")
+
+    # Read rate-limit headers from every response
+    def track_headers(self, response):
+        with self.lock:
+            used = response.headers.get('X-MBX-USED-WEIGHT-1M') or response.headers.get('X-MBX-USED-WEIGHT')
+            if used is not None:
+                try:
+                    self.used_weight = int(used)
+                    self.weight_window = self._minute()
+                except ValueError:
+                    pass
+            retry_after = response.headers.get('Retry-After')
+            if retry_after is not None and response.status_code in (418, 429):
+                try:
+                    self.blocked_until = max(self.blocked_until, time.time() + float(retry_after))
+                except ValueError:
+                    pass
+
+    def backoff(self, attempt):
+        delay = min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt))
+        return random.uniform(0, delay)  # Full jitter
+
+    def get(self, path, params=None):
+        import requests
+        last_error = None
+        for attempt in range(MAX_RETRIES + 1):
+            if attempt:
+                metrics.inc('cryptodash_fetch_retries_total', {'path': path})
+            self.throttle()
+            try:
+                response = self.session.get(self.base_url + path, params=params,
+                                            timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
+                self.track_headers(response)
+                if response.status_code not in RETRY_STATUS:
+                    response.raise_for_status()
+                    return response.json()
+                last_error = BinanceError(f"HTTP {response.status_code} for {path}")
+                # Banned (418) or rate limited (429): throttle() honours Retry-After
+                if response.status_code in (418, 429) and 'Retry-After' in response.headers:
+                    continue
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                last_error = e
+            except requests.exceptions.HTTPError as e:
+                metrics.inc('cryptodash_fetch_errors_total', {'path': path})
+                try:
+                    code = e.response.json().get('code')
+                except ValueError:
+                    code = None
+                raise BinanceError(str(e), e.response.status_code, code) from e
+            except requests.exceptions.RequestException as e:
+                metrics.inc('cryptodash_fetch_errors_total', {'path': path})
+                raise BinanceError(str(e)) from e
+            if attempt < MAX_RETRIES:
+                self.sleep(self.backoff(attempt))
+        metrics.inc('cryptodash_fetch_errors_total', {'path': path})
+        raise BinanceError(f"Request to {path} failed after {MAX_RETRIES + 1} attempts: {last_error}")
+
+    # Stops waiting requests when quitting (requests in flight end at their timeouts)
+    def shutdown(self):
+        self.closing.set()
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+
+client = BinanceClient()
+
+# Binance Free Data API
+def pair_symbol(token_id):
+    return f'{token_id.upper()}{QUOTE_ASSET}'
+
+def parse_ticker(data_binance, token_id):
+    data = {
+        'price': float(data_binance['lastPrice']),
+        '24h_change': float(data_binance['priceChangePercent']),
+        'symbol': token_id.upper()
+    }
+    # Top of book, when the endpoint provides it
+    if 'bidPrice' in data_binance:
+        data['bid'] = float(data_binance['bidPrice'])
+        data['ask'] = float(data_binance['askPrice'])
+    return data
+
+def empty_ticker():
+    return {
+        'price': 0,
+        '24h_change': 0,
+        'symbol': 'N/A'
+    }
+
+# Symbols Binance rejected (typo or delisted token in tokens.json), never requested again
+invalid_symbols = set()
+
+# One batched ticker request (at most MAX_SYMBOLS); a 400 for an unknown symbol is narrowed down by splitting the batch
+def get_tickers(symbols):
+    params = {
+        'symbols': json.dumps(symbols, separators=(',', ':'))
+    }
+    try:
+        return client.get('/api/v3/ticker/24hr', params)
+    except BinanceError as e:
+        if e.status != 400:
+            raise
+        if len(symbols) == 1:
+            if e.code != INVALID_SYMBOL:
+                raise
+            print(f"Binance does not know {symbols[0]}, dropping it")
+            invalid_symbols.add(symbols[0])
+            return []
+        middle = len(symbols) // 2
+        return get_tickers(symbols[:middle]) + get_tickers(symbols[middle:])
+
+# Batched ticker for several tokens in a single request
+def get_tokens_data(token_ids):
+    pairs = {pair_symbol(token_id): token_id for token_id in token_ids}
+    pairs = {symbol: token_id for symbol, token_id in pairs.items() if symbol not in invalid_symbols}
+
+    snapshot = {}
+    if not pairs:
+        return snapshot
+    symbols = list(pairs)
+    try:
+        # Never ask for the whole exchange: long lists go out in chunks of MAX_SYMBOLS
+        for offset in range(0, len(symbols), MAX_SYMBOLS):
+            chunk = symbols[offset:offset + MAX_SYMBOLS]
+            start = time.perf_counter()
+            tickers = get_tickers(chunk)
+            elapsed = time.perf_counter() - start
+            for symbol in chunk:
+                metrics.observe('cryptodash_fetch_seconds', elapsed, {'symbol': symbol})
+            for data_binance in tickers:
+                token_id = pairs.get(data_binance.get('symbol'))
+                if token_id is not None:
+                    snapshot[token_id] = parse_ticker(data_binance, token_id)
+    except (BinanceError, ValueError, KeyError) as e:
+        print(f"Error fetching data from Binance: {e}")
+
+    return snapshot
+
+# Order book snapshot {'lastUpdateId', 'bids', 'asks'} (weight grows with limit: 1000 levels = 10)
+def get_depth(token_id, limit=1000):
+    return client.get('/api/v3/depth', {'symbol': pair_symbol(token_id), 'limit': limit})
+
+# Candles in [start_time, end_time] (ms) as (open_time_ms, open, high, low, close, volume), raises BinanceError
+def fetch_klines(token_id, interval, start_time, end_time, limit=1000):
+    params = {
+        'symbol': pair_symbol(token_id),
+        'interval': interval,
+        'startTime': int(start_time),
+        'endTime': int(end_time),
+        'limit': limit
+    }
+    try:
+        return [
+            (int(kline[0]), float(kline[1]), float(kline[2]), float(kline[3]), float(kline[4]), float(kline[5]))
+            for kline in client.get('/api/v3/klines', params)
+        ]
+    except (ValueError, KeyError, IndexError, TypeError) as e:
+        raise BinanceError(f"Malformed klines: {e}") from e
@@ -0,0 +1,175 @@
+import os
+import sqlite3
+import threading
+import time
+from binance_client import pair_symbol, fetch_klines, BinanceError
+from metrics import metrics
+from price_cache import CACHE_DIR
+
+# Local candle store: klines per (symbol, interval) in SQLite, plus the open
+# time ranges already fetched so only the gaps are ever requested again.
+
+# VARIABLES
+CANDLE_DB = os.path.join(CACHE_DIR, 'candles.sqlite')
+KLINES_LIMIT = 1000  # Candles per klines request (the API maximum)
+INTERVAL_SECONDS = {'1m': 60, '5m': 300, '15m': 900, '1h': 3600, '4h': 14400, '1d': 86400}
+# Chart timeframes: span shown -> (candle interval, candles)
+TIMEFRAMES = {
+    '1h': ('1m', 60),
+    '4h': ('1m', 240),
+    '1d': ('5m', 288),
+    '1w': ('1h', 168),
+    '1M': ('4h', 180),
+}
+DEFAULT_TIMEFRAME = os.environ.get('CRYPTODASH_TIMEFRAME', '4h')
+if DEFAULT_TIMEFRAME not in TIMEFRAMES:
+    print(f"Unknown timeframe {DEFAULT_TIMEFRAME}, using 4h")
+    DEFAULT_TIMEFRAME = '4h'
+RETENTION = 4  # Longest timeframe spans kept per symbol and interval, older candles are pruned
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS candles (
+    symbol TEXT NOT NULL, interval TEXT NOT NULL, open_time INTEGER NOT NULL,
+    open REAL, high REAL, low REAL, close REAL, volume REAL,
+    PRIMARY KEY (symbol, interval, open_time)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS ranges (
+    symbol TEXT NOT NULL, interval TEXT NOT NULL, range_start INTEGER NOT NULL, range_end INTEGER NOT NULL,
+    PRIMARY KEY (symbol, interval, range_start)
+) WITHOUT ROWID;
+'''
+
+# Split [start, end] (open times, ms) into requests of at most limit candles
+def batches(gaps, step, limit=KLINES_LIMIT):
+    for start, end in gaps:
+        while start <= end:
+            batch_end = min(end, start + (limit - 1) * step)
+            yield start, batch_end
+            start = batch_end + step
+
+# Candle Store
+class CandleStore:
+    """Candles and fetched ranges in one SQLite file (WAL, one connection per thread).
+
+    Ranges only cover closed candles; the open candle is refreshed by live
+    ticks, or comes along with the last request of a backfill.
+    """
+
+    def __init__(self, path=CANDLE_DB):
+        self.path = path
+        self.local = threading.local()
+
+    @property
+    def db(self):
+        db = getattr(self.local, 'db', None)
+        if db is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            db = sqlite3.connect(self.path, timeout=10)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')  # Fewer fsyncs on SD cards, still safe with WAL
+            db.executescript(SCHEMA)
+            self.local.db = db
+        return db
+
+    def close(self):
+        db = getattr(self.local, 'db', None)
+        if db is not None:
+            db.close()
+            self.local.db = None
+
+    def ranges(self, symbol, interval, start, end):
+        return self.db.execute(
+            'SELECT range_start, range_end FROM ranges WHERE symbol = ? AND interval = ? '
+            'AND range_end >= ? AND range_start <= ? ORDER BY range_start',
+            (symbol, interval, start, end)).fetchall()
+
+    # Open time ranges in [start, end] not fetched yet
+    def missing(self, symbol, interval, start, end):
+        step = INTERVAL_SECONDS[interval] * 1000
+        gaps = []
+        cursor = start
+        for range_start, range_end in self.ranges(symbol, interval, start, end):
+            if range_start > cursor:
+                gaps.append((cursor, range_start - step))
+            cursor = max(cursor, range_end + step)
+        if cursor <= end:
+            gaps.append((cursor, end))
+        return gaps
+
+    # Store candles and mark [start, end] as fetched (merged with touching ranges), in one transaction
+    def insert(self, symbol, interval, candles, start, end):
+        step = INTERVAL_SECONDS[interval] * 1000
+        with self.db as db:
+            db.executemany(
+                'INSERT OR REPLACE INTO candles VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                [(symbol, interval) + tuple(candle) for candle in candles])
+            if start > end:
+                return
+            touching = self.ranges(symbol, interval, start - step, end + step)
+            if touching:
+                start = min(start, touching[0][0])
+                end = max(end, max(range_end for _, range_end in touching))
+                db.executemany(
+                    'DELETE FROM ranges WHERE symbol = ? AND interval = ? AND range_start = ?',
+                    [(symbol, interval, range_start) for range_start, _ in touching])
+            db.execute('INSERT INTO ranges VALUES (?, ?, ?, ?)', (symbol, interval, start, end))
+
+    # Drop candles (and range coverage) older than before
+    def prune(self, symbol, interval, before):
+        with self.db as db:
+            db.execute('DELETE FROM candles WHERE symbol = ? AND interval = ? AND open_time < ?', (symbol, interval, before))
+            db.execute('DELETE FROM ranges WHERE symbol = ? AND interval = ? AND range_end < ?', (symbol, interval, before))
+            db.execute('UPDATE ranges SET range_start = ? WHERE symbol = ? AND interval = ? AND range_start < ?',
+                       (before, symbol, interval, before))
+
+    # Candles as (open_time_seconds, close_price) pairs, oldest first
+    def closes(self, symbol, interval, start, end):
+        return [
+            (open_time / 1000, close) for open_time, close in self.db.execute(
+                'SELECT open_time, close FROM candles WHERE symbol = ? AND interval = ? '
+                'AND open_time BETWEEN ? AND ? ORDER BY open_time',
+                (symbol, interval, start, end))
+        ]
+
+    def window(self, timeframe, now=None):
+        interval, count = TIMEFRAMES[timeframe]
+        step = INTERVAL_SECONDS[interval] * 1000
+        current = int((time.time() if now is None else now) * 1000) // step * step  # Open candle
+        return interval, step, current - (count - 1) * step, current
+
+    # Chart data straight from the store (no network I/O)
+    def history(self, token_id, timeframe, now=None):
+        interval, _, start, current = self.window(timeframe, now)
+        try:
+            return self.closes(pair_symbol(token_id), interval, start, current)
+        except sqlite3.Error as e:
+            print(f"Error reading candle store: {e}")
+            return []
+
+    def backfill(self, token_id, timeframe, now=None, fetch=fetch_klines, interrupted=None):
+        """Fetches the closed candles of the timeframe that are not stored yet.
+
+        Returns the number of klines requests made (0 when the store was complete).
+        """
+        interval, step, start, current = self.window(timeframe, now)
+        symbol = pair_symbol(token_id)
+        requests = 0
+        try:
+            gaps = self.missing(symbol, interval, start, current - step)
+            if gaps and gaps[-1][1] == current - step:
+                # The open candle comes for free with the newest gap
+                gaps[-1] = (gaps[-1][0], current)
+            for batch_start, batch_end in batches(gaps, step):
+                if interrupted is not None and interrupted():
+                    break
+                candles = fetch(token_id, interval, batch_start, batch_end, KLINES_LIMIT)
+                requests += 1
+                metrics.inc('cryptodash_candle_requests_total', {'interval': interval})
+                self.insert(symbol, interval, candles, batch_start, min(batch_end, current - step))
+            longest = max(candles for name, candles in TIMEFRAMES.values() if name == interval)
+            self.prune(symbol, interval, current - RETENTION * longest * step)
+        except BinanceError as e:
+            print(f"Error fetching klines from Binance: {e}")
+        except sqlite3.Error as e:
+            print(f"Error updating candle store: {e}")
+        return requests
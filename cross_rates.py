@@ -0,0 +1,72 @@
+import os
+
+# Display currencies derived locally from the batched USDT ticker snapshot.
+# A currency costs at most one extra symbol (its <CODE>USDT pair), which is
+# already fetched when that asset is one of the dashboard tokens (e.g. BTC).
+
+# VARIABLES
+QUOTE_CURRENCY = 'USD'  # USDT quotes are displayed as USD
+DISPLAY_CURRENCY = os.environ.get('CRYPTODASH_CURRENCY', QUOTE_CURRENCY).upper()
+CURRENCIES = {
+    # code: (rate token priced in USDT, price format)
+    'USD': (None, '{:,.2f} $'),
+    'EUR': ('eur', '{:,.2f} €'),
+    'GBP': ('gbp', '{:,.2f} £'),
+    'BTC': ('btc', '{:,.8f} BTC'),
+    'ETH': ('eth', '{:,.6f} ETH'),
+    'BNB': ('bnb', '{:,.5f} BNB'),
+}
+if DISPLAY_CURRENCY not in CURRENCIES:
+    print(f"Unknown currency {DISPLAY_CURRENCY}, using {QUOTE_CURRENCY}")
+    DISPLAY_CURRENCY = QUOTE_CURRENCY
+
+class CrossRates:
+    def __init__(self, currency=DISPLAY_CURRENCY):
+        currency = currency.upper()
+        if currency not in CURRENCIES:
+            raise ValueError(f"Unsupported display currency {currency}, use one of {', '.join(CURRENCIES)}")
+        self.currency = currency
+        self.rate_token, self.price_format = CURRENCIES[currency]
+
+    # Token ids to fetch: the requested ones plus the rate pair, once
+    def with_rate_token(self, token_ids):
+        token_ids = list(token_ids)
+        if self.rate_token is not None and self.rate_token not in token_ids:
+            token_ids.append(self.rate_token)
+        return token_ids
+
+    def is_rate_token(self, token_id):
+        return token_id == self.rate_token
+
+    def rate(self, snapshot):
+        """Returns (price of one display unit in USDT, its 24h change %), or None while unknown."""
+        if self.rate_token is None:
+            return 1.0, 0.0
+        data = snapshot.get(self.rate_token)
+        if not data or not data.get('price'):
+            return None
+        return data['price'], data['24h_change']
+
+    def convert(self, snapshot, rates=None):
+        """Returns {token_id: ticker} in the display currency, converted in one pass.
+
+        The rate is read from rates (default: snapshot itself). Falls back to USD
+        while the rate has not been fetched yet; each ticker carries the
+        'currency' it is expressed in.
+        """
+        rate = self.rate(snapshot if rates is None else rates)
+        if rate is None:
+            return {token_id: dict(data, currency=QUOTE_CURRENCY) for token_id, data in snapshot.items()}
+        price_factor = 1.0 / rate[0]
+        change_factor = 1.0 / (1 + rate[1] / 100)
+        currency = self.currency
+        # Cross 24h change: (1 + token change) / (1 + rate change) - 1
+        return {
+            token_id: dict(data, price=data['price'] * price_factor,
+                           **{'24h_change': ((1 + data['24h_change'] / 100) * change_factor - 1) * 100},
+                           currency=currency)
+            for token_id, data in snapshot.items()
+        }
+
+def format_price(price, currency):
+    return CURRENCIES[currency][1].format(price)
@@ -1,25 +1,57 @@
 import sys
 import os
-import requests
-from PyQt5.QtWidgets import QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QGraphicsDropShadowEffect, QSpacerItem, QSizePolicy, QProgressDialog
-from PyQt5.QtGui import QPixmap, QFont, QFontDatabase, QColor, QIcon, QPalette, QBrush
-from PyQt5.QtCore import QTimer, Qt, QSize, QProcess, QEvent
-from functools import partial
+import time
+import argparse
+import json
+from startup_trace import tracer, TRACE_ENABLED
+from PyQt5.QtWidgets import QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QGraphicsDropShadowEffect, QSpacerItem, QSizePolicy
+from PyQt5.QtGui import QFont, QFontDatabase, QColor, QPalette, QBrush
+from PyQt5.QtCore import QTimer, Qt, QSize, QEvent, QThread, QProcess, pyqtSignal
+from functools import lru_cache
 from datetime import datetime
-from screeninfo import get_monitors, ScreenInfoError
+from binance_client import client, get_tokens_data, empty_ticker
+from price_stream import PriceStream
+from image_cache import image_cache
+from market_tape import TapeRecorder, TapeReplay
+from price_history import PriceHistory, Sparkline
+from candle_store import CandleStore, TIMEFRAMES, INTERVAL_SECONDS, DEFAULT_TIMEFRAME
+from price_cache import load_prices, save_prices, SAVE_INTERVAL
+from shadow_label import ShadowLabel, render_shadow
+from poll_scheduler import PollScheduler, display_powered
+from daemon_client import DaemonFeed
+from token_selector import TokenSelector, load_tokens
+from cross_rates import CrossRates, format_price, DISPLAY_CURRENCY, CURRENCIES
+from alerts import AlertEngine, load_alerts
+from wifi_backend import HelperWiFi
+from metrics import metrics, start_http_server, start_json_writer, METRICS_PORT, METRICS_FILE
+tracer.mark('imports')
 
 # VARIABLES
 BASE_PATH = os.path.dirname(os.path.realpath(__file__))
 IMG_PATH = os.path.join(BASE_PATH, "images")
 BACKGROUND_PATH = os.path.join(IMG_PATH, "backgrounds")
 TOKEN_PATH = os.path.join(IMG_PATH, "tokens")
-THUMB_PATH = os.path.join(IMG_PATH, "thumbs")
 FONT_PATH = os.path.join(BASE_PATH, "fonts")
 ICON_SIZE = 220
 DATE_FORMAT = "%d-%m-%Y"
 BUTTON_SIZE = 80
-
+DISPLAY_CHECK_INTERVAL = 5000  # ms between display power checks while polling is paused
+STREAM_MODE = os.environ.get('CRYPTODASH_STREAM') == '1'
+STREAM_MAX_FPS = float(os.environ.get('CRYPTODASH_MAX_FPS', 4))
+PRELOAD_LOGOS = 10  # Token logos decoded after the first frame, the rest load on demand
+LOW_POWER_MODE = os.environ.get('CRYPTODASH_LOW_POWER') == '1'
+DEPTH_MODE = os.environ.get('CRYPTODASH_DEPTH') == '1'
+MEMORY_BUDGET = int(os.environ.get('CRYPTODASH_MEMORY_BUDGET', 0))  # MiB, see memory_budget.py
+FRAME_INTERVAL = 33  # ms, label updates are coalesced into one repaint per frame in low power mode
+DEFAULT_RESOLUTION = (800, 480)
+ALERT_BANNER_TIMEOUT = 15000  # ms an alert stays on screen
+ALERT_BANNER_LINES = 3
+QUIT_WAIT = 2000  # ms a worker thread gets to finish when quitting
+
+# Monitor probing is slow on a Pi, so it is memoized and done after the first frame
+@lru_cache(maxsize=None)
 def get_screen_resolution():
+    from screeninfo import get_monitors, ScreenInfoError
     try:
         monitors = get_monitors()
         if monitors:
@@ -31,9 +63,10 @@ def get_screen_resolution():
     except ScreenInfoError as e:
         print(f"ScreenInfoError: {e}")
         # Return default resolution if no monitors are found
-        return 800, 480
+        return DEFAULT_RESOLUTION
 
 # Raspberry Pi Check
+@lru_cache(maxsize=None)
 def is_raspberry_pi():
     try:
         with open('/proc/cpuinfo', 'r') as f:
@@ -42,78 +75,122 @@ def is_raspberry_pi():
         print(f"Not Raspberry")
     return False
 
-# Binance Free Data API
-def get_token_data(token_id):
-    base_url = 'https://api.binance.com/api/v3/ticker/24hr'
-    params = {
-        'symbol': f'{token_id.upper()}USDT'
-    }
+# Threads still busy at quit are detached, so Qt never destroys a running QThread with its parent
+abandoned_threads = []
 
-    try:
-        response = requests.get(base_url, params=params)
-        response.raise_for_status()
-        data_binance = response.json()
-
-        data = {
-            'price': float(data_binance['lastPrice']),
-            '24h_change': float(data_binance['priceChangePercent']),
-            'symbol': token_id.upper()
-        }
-        
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching data from Binance: {e}")
-        data = {
-            'price': 0,
-            '24h_change': 0,
-            'symbol': 'N/A'
-        }
-        
-    return data
+def finish_thread(thread, timeout=QUIT_WAIT):
+    if thread.wait(timeout):
+        return True
+    print(f"{type(thread).__name__} still busy at quit, not waiting for it")
+    thread.setParent(None)
+    abandoned_threads.append(thread)
+    return False
+
+# Background Fetch Worker (keeps network I/O off the GUI thread)
+class FetchWorker(QThread):
+    data_ready = pyqtSignal(dict)
+
+    def __init__(self, token_ids, parent=None):
+        super().__init__(parent)
+        self.token_ids = token_ids
+
+    def run(self):
+        with metrics.time('cryptodash_section_seconds', {'section': 'update_data'}):
+            snapshot = get_tokens_data(self.token_ids)
+        self.data_ready.emit(snapshot)
+
+# Background History Backfill (only the candles missing from the store are fetched)
+class HistoryWorker(QThread):
+    history_ready = pyqtSignal(str, str, list)
+
+    def __init__(self, token_ids, timeframe, store, parent=None):
+        super().__init__(parent)
+        self.token_ids = token_ids
+        self.timeframe = timeframe
+        self.store = store
+
+    def run(self):
+        try:
+            for token_id in self.token_ids:
+                if self.isInterruptionRequested():
+                    return
+                if self.store.backfill(token_id, self.timeframe, interrupted=self.isInterruptionRequested):
+                    self.history_ready.emit(token_id, self.timeframe, self.store.history(token_id, self.timeframe))
+        finally:
+            self.store.close()
 
 # Main App
 class CryptoDashboard(QWidget):
-    def __init__(self):
+    def __init__(self, stream=STREAM_MODE, max_fps=STREAM_MAX_FPS, record=None, replay=None, replay_speed=1.0, low_power=LOW_POWER_MODE,
+                 metrics_port=METRICS_PORT, metrics_file=METRICS_FILE, tokens=None, currency=DISPLAY_CURRENCY, memory_budget=MEMORY_BUDGET, depth=DEPTH_MODE,
+                 timeframe=DEFAULT_TIMEFRAME):
         super().__init__()
-        self.current_token = 'Bitcoin'
-        self.current_token_symbol = 'btc'
+        # Caches are capped before anything gets decoded
+        self.memory_monitor = None
+        if memory_budget:
+            from memory_budget import start_memory_budget
+            self.memory_monitor = start_memory_budget(memory_budget, self)
+        self.token_config = tokens if tokens is not None else load_tokens()
+        self.cross_rates = CrossRates(currency)
+        alerts, self.alert_hook = load_alerts()
+        self.alert_engine = AlertEngine(alerts)
+        unknown = self.alert_engine.symbols() - {token_id for _, token_id in self.token_config}
+        if unknown:
+            print(f"Alerts for tokens that are not on the dashboard are ignored: {', '.join(sorted(unknown))}")
+        self.alert_messages = []
+        self.metrics_port = metrics_port
+        self.metrics_file = metrics_file
+        self.last_update = {}
+        self.wifi_backend = None
+        self.settings_panel = None
+        self.low_power = low_power
+        self.pending_text = {}
+        self.stream_enabled = stream and not replay
+        self.recorder = TapeRecorder(record) if record else None
+        self.replay_path = replay
+        self.replay_speed = replay_speed
+        self.replay = None
+        self.max_fps = max_fps
+        self.price_stream = None
+        self.depth_stream = None
+        self.depth_view = None  # Built the first time depth is shown
+        self.retired_depth_streams = []  # Stopped streams still finishing a request
+        self.show_depth = depth and not replay
+        self.render_pending = False
+        self.current_token, self.current_token_symbol = self.token_config[0]
         self.current_background_index = 0
-        self.width_res, self.height_res = get_screen_resolution()
+        self.tokens = {}
+        self.ticker_snapshot = {}
+        self.display_snapshot = {}  # ticker_snapshot in the display currency
+        self.timeframe = timeframe if timeframe in TIMEFRAMES else DEFAULT_TIMEFRAME
+        self.candle_store = CandleStore()
+        self.price_history = {}
+        self.history_worker = None
+        self.backfilled = set()
+        self.backfill_queue = []
+        self.last_cache_save = 0
+        self.fetch_worker = None
+        self.fetch_pending = set()
+        self.stream_connected = False
+        self.daemon_feed = None
+        self.daemon_connected = False
+        self.scheduler = PollScheduler()
+        self.width_res, self.height_res = DEFAULT_RESOLUTION
+        self.first_frame = False
+        # Last known prices so the first frame never waits for the network
+        if not replay:
+            self.ticker_snapshot.update(load_prices())
+            self.update_display(self.ticker_snapshot)
+        tracer.mark('load price cache')
         self.initUI()
+        tracer.mark('build UI')
 
     def initUI(self):
         
-        # Progress Dialog
-        self.progress_dialog = QProgressDialog("Loading...\nPlease Wait", None, 0, 0, self)
-        self.progress_dialog.setWindowModality(Qt.WindowModal)
-        self.progress_dialog.setWindowFlags(Qt.FramelessWindowHint | Qt.Dialog)
-        self.progress_dialog.setCancelButton(None)
-        self.progress_dialog.hide()
-        self.progress_dialog.cancel()
-        self.progress_dialog.setStyleSheet("""
-            QProgressDialog {
-                background-color: #333333; 
-                color: white; 
-                border: none; 
-                padding: 10px;
-            }
-            QLabel {
-                background-color: #333333; 
-                color: white;
-                font-size: 18px;
-                font-weight: bold;
-            }
-            QProgressBar {
-                border: 1px solid #555555;
-                border-radius: 5px;
-                background: #777777;
-                height: 10px;
-                text-align: center;
-            }
-            QProgressBar::chunk {
-                background-color: #222222; 
-                width: 10px;
-            }
-        """)
+        # Coalesced label updates (low power mode)
+        self.frame_timer = QTimer(self)
+        self.frame_timer.setSingleShot(True)
+        self.frame_timer.timeout.connect(self.flush_text)
 
         # Setup Window
         self.setWindowTitle('Crypto Dashboard')
@@ -124,8 +201,7 @@ class CryptoDashboard(QWidget):
         # Remove navigation bar if on Raspberry Pi
         # self.setWindowFlag(Qt.FramelessWindowHint)
 
-        # Load Montserrat fonts
-        QFontDatabase.addApplicationFont(os.path.join(FONT_PATH, "Montserrat-ExtraBold.ttf"))
+        # Load Montserrat font (the bold face is loaded after the first frame)
         QFontDatabase.addApplicationFont(os.path.join(FONT_PATH, "Montserrat-Regular.ttf"))
 
         # Main Layout
@@ -133,21 +209,16 @@ class CryptoDashboard(QWidget):
         main_layout.setContentsMargins(25, 25, 25, 25)  # Adjust margins
         # main_layout.setSpacing(20)  # Adjust spacing between elements
 
-        # Button Layout with fixed size
-        self.button_widget = QWidget()
-        self.button_widget.setStyleSheet("background-color: transparent;")
-        self.button_widget.setFixedSize(600, 80)
-        self.button_layout = QHBoxLayout(self.button_widget)
-        self.add_button(self.button_layout, 'Bitcoin', 'btc')
-        self.add_button(self.button_layout, 'Ethereum', 'eth')
-        self.add_button(self.button_layout, 'Cardano', 'ada')
-        self.add_button(self.button_layout, 'Binance', 'bnb')
-        self.add_button(self.button_layout, 'Solana', 'sol')
-
-        # Create an additional layout to center the button_widget
+        # Token Selector (configured in tokens.json, scrolls when there are many)
+        for token_name, token_id in self.token_config:
+            self.add_token(token_name, token_id)
+        self.token_selector = TokenSelector(self.token_config, BUTTON_SIZE, QSize(int(BUTTON_SIZE/1.5), int(BUTTON_SIZE/1.5)), parent=self)
+        self.token_selector.token_selected.connect(self.change_token)
+
+        # Create an additional layout to center the token selector
         button_wrapper_layout = QHBoxLayout()
         button_wrapper_layout.addStretch(1)
-        button_wrapper_layout.addWidget(self.button_widget)
+        button_wrapper_layout.addWidget(self.token_selector)
         button_wrapper_layout.addStretch(1)
 
         # Info Layout Center Box
@@ -164,13 +235,13 @@ class CryptoDashboard(QWidget):
         # Bitcoin Logo
         logo_container = QVBoxLayout()
         self.logo_label = QLabel(self)
-        pixmap = QPixmap(os.path.join(TOKEN_PATH, "btc.png"))
-        scaled_pixmap = pixmap.scaled(ICON_SIZE, ICON_SIZE, Qt.KeepAspectRatio)
-        self.logo_label.setPixmap(scaled_pixmap)
+        self.logo_label.setPixmap(self.logo_pixmap(self.current_token_symbol))
         self.logo_label.setAlignment(Qt.AlignLeft | Qt.AlignVCenter)
         self.logo_label.setStyleSheet("background-color: transparent;")
-        self.set_shadow(self.logo_label, 'gray', 50)
+        if not self.low_power:
+            self.set_shadow(self.logo_label, 'gray', 50)
         logo_container.addWidget(self.logo_label)
+        self.logo_container = logo_container  # The depth view takes the logo's place, tap the price to toggle
         main_info_layout.addLayout(logo_container)
 
         # Space between Logo and Text
@@ -182,30 +253,31 @@ class CryptoDashboard(QWidget):
         self.text_info_layout.setAlignment(Qt.AlignLeft | Qt.AlignVCenter)
 
         # Name Label
-        self.name_label = QLabel('Bitcoin (BTC)', self)
-        self.name_label.setFont(QFont('Montserrat', 44, QFont.Bold))
-        self.name_label.setStyleSheet("background-color: transparent; color: white;")
+        self.name_label = self.create_text_label('Bitcoin (BTC)', QFont('Montserrat', 44, QFont.Bold), "#00FF00", 15)
         self.text_info_layout.addWidget(self.name_label)
-        self.set_shadow(self.name_label, 'gray', 10)
-        shadow_effect = QGraphicsDropShadowEffect()
-        shadow_effect.setBlurRadius(15)
-        shadow_effect.setColor(QColor("#00FF00"))
-        shadow_effect.setOffset(0, 0)
-        self.name_label.setGraphicsEffect(shadow_effect)
 
         # Price Label
-        self.price_label = QLabel('Price: $0', self)
-        self.price_label.setFont(QFont('Montserrat', 36, QFont.Normal))
-        self.price_label.setStyleSheet("background-color: transparent; color: white;")
+        self.price_label = self.create_text_label('Price: $0', QFont('Montserrat', 36, QFont.Normal), 'gray', 10)
         self.text_info_layout.addWidget(self.price_label)
-        self.set_shadow(self.price_label, 'gray', 10)
+
+        # Price Sparkline
+        self.sparkline = Sparkline(self)
+        self.sparkline.set_history(self.price_history.get(self.current_token_symbol))
+        self.sparkline.label = self.timeframe
+        self.sparkline.mousePressEvent = self.next_timeframe
+        self.text_info_layout.addWidget(self.sparkline)
         
         # 24h Change Label
-        self.day_change_label = QLabel('24h Change: 0%', self)
-        self.day_change_label.setFont(QFont('Montserrat', 28, QFont.Normal))
-        self.day_change_label.setStyleSheet("background-color: transparent; color: white;")
+        self.day_change_label = self.create_text_label('24h Change: 0%', QFont('Montserrat', 28, QFont.Normal), 'gray', 10)
         self.text_info_layout.addWidget(self.day_change_label)
-        self.set_shadow(self.day_change_label, 'gray', 10)
+        self.price_label.mousePressEvent = self.toggle_depth
+
+        # Stale Data Label (cached prices shown until the first fetch)
+        self.stale_label = QLabel('', self)
+        self.stale_label.setFont(QFont('Montserrat', 14, QFont.Normal))
+        self.stale_label.setStyleSheet("background-color: transparent; color: orange;")
+        self.stale_label.hide()
+        self.text_info_layout.addWidget(self.stale_label)
         
         # Layouts Composition
         main_info_layout.addLayout(self.text_info_layout)
@@ -234,14 +306,28 @@ class CryptoDashboard(QWidget):
 
         # Settings Button
         self.settings_button = QLabel(self)
-        pixmap = QPixmap(os.path.join(IMG_PATH, "settings.png"))
-        self.settings_button.setPixmap(pixmap.scaled(30, 30, Qt.KeepAspectRatio))
+        settings_pixmap = image_cache.pixmap(os.path.join(IMG_PATH, "settings.png"), (30, 30))
         self.settings_button.setAlignment(Qt.AlignCenter | Qt.AlignTop)
         self.settings_button.mousePressEvent = self.settings_button_clicked
-        self.set_shadow(self.settings_button, 'white', 10)
+        if self.low_power:
+            self.settings_button.setPixmap(render_shadow(settings_pixmap, 'white', 10))
+        else:
+            self.settings_button.setPixmap(settings_pixmap)
+            self.set_shadow(self.settings_button, 'white', 10)
         self.settings_button.setGeometry(20, 20, 60, 60)
         self.settings_button.setStyleSheet("background-color: transparent; border: none;")
 
+        # Alert Banner (over everything, hidden until an alert fires)
+        self.alert_banner = QLabel(self)
+        self.alert_banner.setAlignment(Qt.AlignCenter)
+        self.alert_banner.setFont(QFont('Montserrat', 16, QFont.Bold))
+        self.alert_banner.setStyleSheet("color: white; background-color: rgba(200,120,0,220); padding: 6px;")
+        self.alert_banner.mousePressEvent = lambda event: self.alert_banner.hide()
+        self.alert_banner.hide()
+        self.alert_timer = QTimer(self)
+        self.alert_timer.setSingleShot(True)
+        self.alert_timer.timeout.connect(self.hide_alert_banner)
+
         # Setup Main Layout
         main_layout.addLayout(button_wrapper_layout)
         main_layout.addLayout(centered_layout)
@@ -250,14 +336,27 @@ class CryptoDashboard(QWidget):
 
         self.setLayout(main_layout)
 
-        # Update Data Price every 1 min
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.update_data)
-        self.timer.start(60000)
+        # Update Data Price (adaptive interval, see poll_scheduler)
+        self.scheduler.set_active(self.current_token_symbol)
+        self.data_timer = QTimer(self)
+        self.data_timer.setSingleShot(True)
+        self.data_timer.timeout.connect(self.poll)
+
+        # Shared price daemon if one is running, else streaming / polling
+        if not self.replay_path and DaemonFeed.available():
+            self.start_daemon_feed()
+        elif self.stream_enabled:
+            self.start_stream()
+
+        # Show cached prices right away
+        self.render_data()
 
-        # Update Data
-        self.update_data()
-        QTimer.singleShot(1000, self.update_data)
+        # Update Data (or replay a recorded tape)
+        if self.replay_path:
+            self.start_replay()
+        else:
+            self.request_backfill(self.current_token_symbol)
+            QTimer.singleShot(0, self.poll)
 
         # Set Background
         QTimer.singleShot(1000, self.set_background)
@@ -271,52 +370,118 @@ class CryptoDashboard(QWidget):
           
         app = QApplication.instance()
         app.installEventFilter(self)
+        app.aboutToQuit.connect(self.stop_fetch)
+        app.aboutToQuit.connect(self.stop_stream)
+        app.aboutToQuit.connect(self.stop_daemon_feed)
+        app.aboutToQuit.connect(self.stop_wifi_helper)
+        app.aboutToQuit.connect(self.quit_depth)
+
+        if self.show_depth:
+            self.start_depth()
+
+        # Metrics endpoint / file
+        if self.metrics_port or self.metrics_file:
+            self.start_metrics()
       
     # Update Date Time
     def update_time(self):
-        current_date = datetime.now().strftime(DATE_FORMAT)
-        current_time = datetime.now().strftime('%H:%M:%S')
-        self.label_date.setText(current_date)
-        self.label_time.setText(current_time)
+        now = datetime.now()
+        self.set_text(self.label_date, now.strftime(DATE_FORMAT))
+        self.set_text(self.label_time, now.strftime('%H:%M:%S'))
+
+    # Text Labels (pre-rendered shadows in low power mode, live effects otherwise)
+    def create_text_label(self, text, font, shadow_color, blur_radius):
+        if self.low_power:
+            return ShadowLabel(text, self, font, 'white', shadow_color, blur_radius)
+        label = QLabel(text, self)
+        label.setFont(font)
+        label.setStyleSheet("background-color: transparent; color: white;")
+        self.set_shadow(label, shadow_color, blur_radius)
+        return label
+
+    # Dirty-checked label update, coalesced to one repaint per frame in low power mode
+    def set_text(self, label, text):
+        if not self.low_power:
+            if label.text() != text:
+                label.setText(text)
+            return
+        if self.pending_text.get(label, label.text()) == text:
+            return
+        self.pending_text[label] = text
+        if not self.frame_timer.isActive():
+            self.frame_timer.start(FRAME_INTERVAL)
+
+    def flush_text(self):
+        pending, self.pending_text = self.pending_text, {}
+        for label, text in pending.items():
+            if label.text() != text:
+                label.setText(text)
         
     # Set Single Background
     def set_background(self):
+        with metrics.time('cryptodash_section_seconds', {'section': 'set_background'}):
+            self.apply_background()
+
+    def apply_background(self):
         palette = QPalette()
-        pixmap = QPixmap(os.path.join(BACKGROUND_PATH, "img11.jpg"))
-        scaled_pixmap = pixmap.scaled(self.size(), Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+        scaled_pixmap = image_cache.pixmap(os.path.join(BACKGROUND_PATH, "img11.jpg"), self.size(), Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
         palette.setBrush(QPalette.Window, QBrush(scaled_pixmap))
         self.setPalette(palette)
         
+    # A top level UpdateRequest repaints every dirty child (labels, shadow effects, sparkline)
+    def event(self, event):
+        if event.type() == QEvent.UpdateRequest:
+            with metrics.time('cryptodash_section_seconds', {'section': 'paint'}):
+                return super().event(event)
+        return super().event(event)
+
     def resizeEvent(self, event):
         self.set_background()
+        if self.settings_panel is not None:
+            self.settings_panel.setGeometry(self.rect())
+        self.alert_banner.resize(self.width(), self.alert_banner.height())
         super().resizeEvent(event)
 
-    # Add Buttons
-    def add_button(self, layout, token_name, token_id):
-        button = QPushButton(self)
-        button.setIcon(QIcon(os.path.join(THUMB_PATH, f"{token_id}.png")))
-        button.setIconSize(QSize(int(BUTTON_SIZE/1.5), int(BUTTON_SIZE/1.5)))
-        button.setFixedSize(BUTTON_SIZE, BUTTON_SIZE)
-        button.setStyleSheet("""
-            QPushButton {
-                background-color: transparent; 
-                border: none; 
-                padding: 0px; 
-            }
-            QPushButton:focus {
-                outline: none;
-            }
-        """)
-        button.clicked.connect(partial(self.change_token, token_name, token_id, button))
-        layout.addWidget(button)
+    # Register Token
+    def add_token(self, token_name, token_id):
+        self.tokens[token_id] = token_name
+        self.scheduler.add_token(token_id)
+        self.price_history[token_id] = self.new_history()
+
+    # Token Logos (decoded and scaled once, then served from the image cache)
+    def token_logo(self, token_id):
+        return image_cache.pixmap(os.path.join(TOKEN_PATH, f"{token_id}.png"), (ICON_SIZE, ICON_SIZE))
+
+    def logo_pixmap(self, token_id):
+        if not self.low_power:
+            return self.token_logo(token_id)
+        # Shadowed logos share the image cache budget (LRU)
+        key = ('shadow', token_id, ICON_SIZE)
+        pixmap = image_cache.get(key)
+        if pixmap is None:
+            pixmap = render_shadow(self.token_logo(token_id), 'gray', 50)
+            image_cache.insert(key, pixmap)
+        return pixmap
+
+    def preload_token_logos(self):
+        for token_id in list(self.tokens)[:PRELOAD_LOGOS]:
+            self.logo_pixmap(token_id)
 
     # Change Token
-    def change_token(self, token_name, token_id, button):
+    def change_token(self, token_name, token_id):
         print("Change token:", token_id)
         self.current_token = token_name
         self.current_token_symbol = token_id
-        self.logo_label.setPixmap(QPixmap(os.path.join(TOKEN_PATH, f"{token_id}.png")).scaled(ICON_SIZE, ICON_SIZE, Qt.KeepAspectRatio))
-        self.update_data()
+        self.logo_label.setPixmap(self.logo_pixmap(token_id))
+        self.sparkline.set_history(self.price_history.get(token_id))
+        self.render_data()
+        self.request_backfill(token_id)
+        if self.depth_stream is not None:
+            self.start_depth()
+        self.scheduler.set_active(token_id)
+        if self.current_token_symbol not in self.ticker_snapshot:
+            self.update_data([token_id])
+        self.schedule_poll()
 
     # Set Shadow
     def set_shadow(self, widget, color: str, blur_radius: int):
@@ -326,48 +491,476 @@ class CryptoDashboard(QWidget):
         shadow_effect.setOffset(0, 0)
         widget.setGraphicsEffect(shadow_effect)
         
-    # Update Data
-    def update_data(self):        
-        data = get_token_data(self.current_token_symbol)
+    # Update Data (one batched request for every registered token, in the background)
+    def update_data(self, token_ids=None):
+        if self.replay_path:
+            return
+        token_ids = list(self.tokens) if token_ids is None else token_ids
+        # Coalesce requests while a fetch is already in flight
+        if self.fetch_worker is not None:
+            self.fetch_pending.update(token_ids)
+            return
+        self.fetch_pending = set()
+        self.scheduler.record(token_ids)
+        self.fetch_worker = FetchWorker(self.cross_rates.with_rate_token(token_ids), self)
+        self.fetch_worker.data_ready.connect(self.on_data_ready)
+        self.fetch_worker.finished.connect(self.on_fetch_finished)
+        self.fetch_worker.start()
+
+    def on_data_ready(self, snapshot):
+        if self.recorder is not None:
+            self.recorder.record(snapshot)
+        self.ticker_snapshot.update(snapshot)
+        self.update_display(snapshot)
+        self.check_alerts(snapshot)
+        self.mark_updated(snapshot)
+        self.scheduler.observe(snapshot)
+        self.update_history(snapshot)
+        self.render_data()
+        # A failed fetch returns an empty snapshot, nothing new to persist
+        if snapshot:
+            self.save_price_cache(force=True)
+
+    def on_fetch_finished(self):
+        self.fetch_worker.deleteLater()
+        self.fetch_worker = None
+        if self.fetch_pending:
+            self.update_data(list(self.fetch_pending))
+
+    # Adaptive Polling
+    def display_active(self):
+        return self.isVisible() and not self.isMinimized() and display_powered()
+
+    # Data pushed by the stream or the price daemon replaces polling
+    def external_feed(self):
+        return self.stream_connected or self.daemon_connected
+
+    def poll(self):
+        if self.replay_path or self.external_feed():
+            return
+        if not self.display_active():
+            # Display off: no requests, just check again later
+            self.scheduler.set_paused(True)
+            self.data_timer.start(DISPLAY_CHECK_INTERVAL)
+            return
+        self.scheduler.set_paused(False)
+        token_ids = self.scheduler.due()
+        if token_ids:
+            self.update_data(token_ids)
+        self.schedule_poll()
+
+    def schedule_poll(self):
+        if self.replay_path or self.external_feed():
+            return
+        self.data_timer.start(int(self.scheduler.next_delay() * 1000))
+
+    def stop_fetch(self):
+        self.fetch_pending = set()
+        client.shutdown()
+        if self.fetch_worker is not None:
+            finish_thread(self.fetch_worker)
+        if self.history_worker is not None:
+            self.history_worker.requestInterruption()
+            finish_thread(self.history_worker)
+
+    # Price History (read from the candle store right away, missing candles backfilled on demand)
+    def new_history(self):
+        interval, count = TIMEFRAMES[self.timeframe]
+        return PriceHistory(count, INTERVAL_SECONDS[interval])
+
+    def request_backfill(self, token_id):
+        if self.replay_path or token_id in self.backfilled:
+            return
+        self.backfilled.add(token_id)
+        stored = self.candle_store.history(token_id, self.timeframe)
+        if stored:
+            self.on_history_ready(token_id, self.timeframe, stored)
+        self.backfill_queue.append(token_id)
+        self.start_backfill()
+
+    def start_backfill(self):
+        if self.history_worker is not None or not self.backfill_queue:
+            return
+        token_ids, self.backfill_queue = self.backfill_queue, []
+        self.history_worker = HistoryWorker(token_ids, self.timeframe, self.candle_store, parent=self)
+        self.history_worker.history_ready.connect(self.on_history_ready)
+        self.history_worker.finished.connect(self.on_backfill_finished)
+        self.history_worker.start()
+
+    def on_backfill_finished(self):
+        self.history_worker.deleteLater()
+        self.history_worker = None
+        self.start_backfill()
+
+    def on_history_ready(self, token_id, timeframe, klines):
+        if timeframe != self.timeframe:
+            return
+        history = self.new_history()
+        history.extend(klines)
+        # Keep ticks that arrived while the backfill was in flight
+        current = self.price_history.get(token_id)
+        if current is not None and len(current):
+            history.push(current.open_time, current.last)
+        self.price_history[token_id] = history
+        if token_id == self.current_token_symbol:
+            self.sparkline.set_history(history)
+
+    # Chart Timeframe (tap the sparkline to cycle)
+    def set_timeframe(self, timeframe):
+        print("Timeframe:", timeframe)
+        self.timeframe = timeframe
+        if self.history_worker is not None:
+            self.history_worker.requestInterruption()
+        self.backfilled = set()
+        self.backfill_queue = []
+        for token_id in self.price_history:
+            self.price_history[token_id] = self.new_history()
+        self.sparkline.label = timeframe
+        self.sparkline.set_history(self.price_history.get(self.current_token_symbol))
+        self.request_backfill(self.current_token_symbol)
+
+    def next_timeframe(self, event=None):
+        timeframes = list(TIMEFRAMES)
+        self.set_timeframe(timeframes[(timeframes.index(self.timeframe) + 1) % len(timeframes)])
+
+    def update_history(self, snapshot):
+        now = time.time()
+        for token_id, data in snapshot.items():
+            history = self.price_history.get(token_id)
+            if history is not None and data['price']:
+                history.push(data.get('time', now), data['price'])
+        if self.current_token_symbol in snapshot:
+            self.sparkline.update()
+
+    # Display Currency (a new rate converts every token in one pass, otherwise only the updated ones)
+    def update_display(self, snapshot):
+        if self.cross_rates.rate_token in snapshot:
+            snapshot = self.ticker_snapshot
+        self.display_snapshot.update(self.cross_rates.convert(snapshot, self.ticker_snapshot))
+
+    # Render current token from the snapshot (no network I/O)
+    def render_data(self):
+        with metrics.time('cryptodash_section_seconds', {'section': 'render_data'}):
+            self.render_labels()
+
+    def render_labels(self):
+        data = self.display_snapshot.get(self.current_token_symbol)
+        if data is None:
+            data = dict(empty_ticker(), currency=self.cross_rates.currency)
         price = data['price']
         day_change = data['24h_change']
 
         # Name and Symbol Update
-        self.name_label.setText(f'{self.current_token} ({self.current_token_symbol.upper()})')
+        self.set_text(self.name_label, f'{self.current_token} ({self.current_token_symbol.upper()})')
         
         # Price Update
-        self.price_label.setText(f'Price: {price:,.2f} $')
+        self.set_text(self.price_label, f'Price: {format_price(price, data["currency"])}')
 
         # 24h Change Label Update
         color = "green" if day_change >= 0 else "red"
-        self.day_change_label.setText(f'24h Change: <span style="color:{color};">{day_change:.2f}%</span>')
+        self.set_text(self.day_change_label, f'24h Change: <span style="color:{color};">{day_change:.2f}%</span>')
 
+        # Stale Indicator
+        if data.get('stale'):
+            since = datetime.fromtimestamp(data['time']).strftime(f'{DATE_FORMAT} %H:%M')
+            self.set_text(self.stale_label, f'Stale since {since}')
+            self.stale_label.show()
+        else:
+            self.stale_label.hide()
+
+    # Price Alerts (only thresholds crossed since the previous tick are visited)
+    def check_alerts(self, snapshot):
+        if not len(self.alert_engine):
+            return
+        for alert, message in self.alert_engine.update_snapshot(snapshot):
+            print("Alert:", message)
+            metrics.inc('cryptodash_alerts_total', {'symbol': alert.token_id.upper(), 'kind': alert.kind})
+            self.show_alert_banner(message)
+            if self.alert_hook:
+                QProcess.startDetached(self.alert_hook, [message, json.dumps(alert.to_dict())])
+
+    def show_alert_banner(self, message):
+        self.alert_messages = (self.alert_messages + [message])[-ALERT_BANNER_LINES:]
+        self.alert_banner.setText('\n'.join(self.alert_messages))
+        self.alert_banner.setGeometry(0, 0, self.width(), self.alert_banner.sizeHint().height())
+        self.alert_banner.show()
+        self.alert_banner.raise_()
+        self.alert_timer.start(ALERT_BANNER_TIMEOUT)
+
+    def hide_alert_banner(self):
+        self.alert_messages = []
+        self.alert_banner.hide()
+
+    # Persist last good prices (atomic write, throttled while streaming)
+    def save_price_cache(self, force=False):
+        if self.replay_path:
+            return
+        now = time.time()
+        if force or now - self.last_cache_save >= SAVE_INTERVAL:
+            self.last_cache_save = now
+            save_prices(self.ticker_snapshot)
+
+    # Start WebSocket Stream
+    def start_stream(self):
+        if not PriceStream.available():
+            print("websocket-client not installed, using REST polling")
+            return
+        self.render_timer = QTimer(self)
+        self.render_timer.timeout.connect(self.flush_render)
+        self.render_timer.start(max(1, int(1000 / self.max_fps)))
+
+        self.price_stream = PriceStream(self.cross_rates.with_rate_token(self.tokens), parent=self)
+        self.price_stream.ticker_received.connect(self.on_stream_ticker)
+        self.price_stream.connected.connect(self.on_stream_connected)
+        self.price_stream.disconnected.connect(self.on_stream_disconnected)
+        self.price_stream.start()
+
+    def stop_stream(self):
+        if self.price_stream is not None:
+            self.price_stream.stop()
+
+    def on_stream_ticker(self, token_id, data):
+        if self.recorder is not None:
+            self.recorder.record({token_id: data})
+        self.ticker_snapshot[token_id] = data
+        self.update_display({token_id: data})
+        self.check_alerts({token_id: data})
+        self.mark_updated({token_id: data})
+        self.update_history({token_id: data})
+        self.save_price_cache()
+        if token_id == self.current_token_symbol or self.cross_rates.is_rate_token(token_id):
+            self.render_pending = True
+
+    # Throttle UI updates to max_fps
+    def flush_render(self):
+        if self.render_pending:
+            self.render_pending = False
+            self.render_data()
+
+    def on_stream_connected(self):
+        print("Price stream connected")
+        self.stream_connected = True
+        self.data_timer.stop()
+
+    def on_stream_disconnected(self):
+        print("Price stream dropped, falling back to polling")
+        if self.stream_connected:
+            self.stream_connected = False
+            self.poll()
+
+    # Metrics
+    def start_metrics(self):
+        self.publish_update_times()
+        metrics.register_callback(self.collect_staleness)
+        self.lag_expected = time.monotonic() + 1
+        self.lag_timer = QTimer(self)
+        self.lag_timer.timeout.connect(self.measure_loop_lag)
+        self.lag_timer.start(1000)
+        if self.metrics_port:
+            try:
+                start_http_server(self.metrics_port)
+            except OSError as e:
+                print(f"Metrics endpoint not started on port {self.metrics_port}: {e}")
+        if self.metrics_file:
+            start_json_writer(self.metrics_file)
+
+    def mark_updated(self, snapshot):
+        now = time.time()
+        for token_id, data in snapshot.items():
+            if not data.get('stale'):
+                self.last_update[token_id] = now
+
+    # Copied on the GUI thread; the exporter threads only read the published dict
+    def publish_update_times(self):
+        update_times = {}
+        for token_id in self.tokens:
+            last = self.last_update.get(token_id)
+            if last is None and token_id in self.ticker_snapshot:
+                last = self.ticker_snapshot[token_id].get('time')
+            update_times[token_id.upper()] = last
+        self.update_times = update_times  # Replaced, never mutated
+
+    def collect_staleness(self, registry):
+        now = time.time()
+        for symbol, last in self.update_times.items():
+            registry.set('cryptodash_data_staleness_seconds', round(now - last, 3) if last else -1, {'symbol': symbol})
+
+    # Event loop lag: how late a 1 s timer fires
+    def measure_loop_lag(self):
+        now = time.monotonic()
+        metrics.observe('cryptodash_event_loop_lag_seconds', max(0.0, now - self.lag_expected))
+        self.lag_expected = now + 1
+        self.publish_update_times()
+
+    # Shared Price Daemon Client
+    def start_daemon_feed(self):
+        self.daemon_feed = DaemonFeed(self.cross_rates.with_rate_token(self.tokens), parent=self)
+        self.daemon_feed.data_ready.connect(self.on_data_ready)
+        self.daemon_feed.connected.connect(self.on_daemon_connected)
+        self.daemon_feed.disconnected.connect(self.on_daemon_disconnected)
+        self.daemon_feed.start()
+
+    def stop_daemon_feed(self):
+        if self.daemon_feed is not None:
+            self.daemon_feed.stop()
+
+    def on_daemon_connected(self):
+        print("Connected to price daemon")
+        self.daemon_connected = True
+        self.data_timer.stop()
+
+    def on_daemon_disconnected(self):
+        print("Price daemon gone, fetching directly")
+        self.daemon_connected = False
+        self.poll()
+
+    # Order Book Depth (local book kept by DepthStream for the selected token)
+    def toggle_depth(self, event=None):
+        if self.depth_stream is not None:
+            self.stop_depth()
+        elif not self.replay_path:
+            self.start_depth()
+
+    # order_book (sortedcontainers) and depth_stream are only loaded once depth is shown
+    def start_depth(self):
+        try:
+            from depth_stream import DepthStream
+        except ImportError as e:
+            print(f"Order book depth unavailable: {e}")
+            return
+        if not DepthStream.available():
+            print("websocket-client not installed, no order book depth")
+            return
+        self.stop_depth()
+        if self.depth_view is None:
+            from order_book import DepthView
+            self.depth_view = DepthView(self)
+            self.depth_view.setFixedSize(ICON_SIZE + 40, ICON_SIZE)
+            self.logo_container.addWidget(self.depth_view)
+        self.depth_view.clear()
+        self.depth_stream = DepthStream(self.current_token_symbol, parent=self)
+        self.depth_stream.depth_ready.connect(self.on_depth_ready)
+        self.depth_stream.start()
+        self.logo_label.hide()
+        self.depth_view.show()
+
+    # Never waits: the old stream is disconnected and deleted once its thread ends
+    def stop_depth(self):
+        if self.depth_stream is None:
+            return
+        stream, self.depth_stream = self.depth_stream, None
+        stream.depth_ready.disconnect(self.on_depth_ready)
+        stream.stop(wait=False)
+        if stream.isFinished():
+            stream.deleteLater()
+        else:
+            self.retired_depth_streams.append(stream)
+            stream.finished.connect(lambda: self.on_depth_finished(stream))
+        self.depth_view.hide()
+        self.logo_label.show()
+
+    def on_depth_finished(self, stream):
+        if stream in self.retired_depth_streams:
+            self.retired_depth_streams.remove(stream)
+            stream.deleteLater()
+
+    def quit_depth(self):
+        self.stop_depth()
+        for stream in self.retired_depth_streams:
+            finish_thread(stream)
+
+    def on_depth_ready(self, token_id, bids, asks):
+        if token_id == self.current_token_symbol:
+            self.depth_view.set_levels(bids, asks)
+
+    # Replay Recorded Market Data
+    def start_replay(self):
+        self.replay = TapeReplay(self.replay_path, self.replay_speed, parent=self)
+        self.replay.data_ready.connect(self.on_data_ready)
+        self.replay.finished.connect(lambda: print("Replay finished"))
+        self.replay.start()
+
+    # Settings Panel (in-process WiFiManager, privileged calls go to the helper)
     def settings_button_clicked(self, event):
-        self.settings_button.setEnabled(False)
-        self.progress_dialog.show()
-        self.progress_dialog.raise_()  # Elevar al frente
-        self.progress_dialog.activateWindow()  # Activar ventana
         print("Settings button clicked")
-        
-        self.process = QProcess(self)
+        self.build_settings_panel()
+        self.settings_panel.setGeometry(self.rect())
+        self.settings_panel.show()
+        self.settings_panel.raise_()
+
+    def build_settings_panel(self):
+        if self.settings_panel is not None:
+            return
+        from network import WiFiManager
+        if self.wifi_backend is None:
+            self.wifi_backend = HelperWiFi(use_sudo=is_raspberry_pi())
+        self.settings_panel = WiFiManager(parent=self, backend=self.wifi_backend)
+        self.settings_panel.hide()
+
+    # Start the persistent WiFi helper so its cold start is paid before the first tap
+    def start_wifi_helper(self):
+        self.wifi_backend = HelperWiFi(use_sudo=is_raspberry_pi())
         try:
-            script_path = os.path.join(BASE_PATH, "network.py")
-            command = ["sudo" if is_raspberry_pi() else "python3", "python3" if is_raspberry_pi() else "python", script_path]
-            self.process.start(command[0], command[1:])
-            print("Network script started")
+            self.wifi_backend.start()
         except Exception as e:
-            print(f"Error opening network script: {str(e)}")
+            print(f"Error starting WiFi helper: {e}")
+
+    def stop_wifi_helper(self):
+        if self.settings_panel is not None:
+            self.settings_panel.stop_workers()
+        if self.wifi_backend is not None:
+            self.wifi_backend.close()
+
+    # Non-critical startup work, run once the first frame is on screen
+    def deferred_init(self):
+        with tracer.phase('deferred: screen probe'):
+            self.width_res, self.height_res = get_screen_resolution()
+            if not self.isFullScreen():
+                self.move(int(self.width_res/2 - self.width()/2), int(self.height_res/2 - self.height()/2))
+        with tracer.phase('deferred: bold font'):
+            QFontDatabase.addApplicationFont(os.path.join(FONT_PATH, "Montserrat-Bold.ttf"))
+            self.update()
+        with tracer.phase('deferred: token logos'):
+            self.preload_token_logos()
+        with tracer.phase('deferred: settings panel'):
+            self.start_wifi_helper()
+            self.build_settings_panel()
+        tracer.report()
 
     def eventFilter(self, obj, event):
-        if event.type() == QEvent.ApplicationActivate:
-            self.progress_dialog.hide()
-            self.settings_button.setEnabled(True)
+        if not self.first_frame and obj is self and event.type() == QEvent.Paint:
+            self.first_frame = True
+            tracer.mark('first frame')
+            QTimer.singleShot(0, self.deferred_init)
         return super().eventFilter(obj, event)
 
 # Main
 if __name__ == '__main__':
-    app = QApplication(sys.argv)
-    ex = CryptoDashboard()
+    parser = argparse.ArgumentParser(description='Crypto Dashboard')
+    parser.add_argument('--stream', action='store_true', help='Use the WebSocket ticker stream')
+    parser.add_argument('--record', metavar='TAPE', help='Append every ticker update to a tape file')
+    parser.add_argument('--replay', metavar='TAPE', help='Replay a recorded tape instead of fetching')
+    parser.add_argument('--replay-speed', type=float, default=1.0, help='Replay speed multiplier (e.g. 1000)')
+    parser.add_argument('--low-power', action='store_true', help='Cached shadows and coalesced label updates')
+    parser.add_argument('--metrics-port', type=int, default=METRICS_PORT, help='Serve Prometheus metrics on 127.0.0.1:PORT')
+    parser.add_argument('--metrics-file', default=METRICS_FILE, help='Periodically write metrics as JSON to this file')
+    parser.add_argument('--trace-startup', action='store_true', default=TRACE_ENABLED, help='Print time spent in each startup phase')
+    parser.add_argument('--depth', action='store_true', help='Show the order book depth of the selected token')
+    parser.add_argument('--timeframe', default=DEFAULT_TIMEFRAME, choices=list(TIMEFRAMES), help='Chart timeframe (tap the chart to cycle)')
+    parser.add_argument('--currency', default=DISPLAY_CURRENCY, type=str.upper, choices=list(CURRENCIES), help='Display currency')
+    parser.add_argument('--memory-budget', type=int, default=MEMORY_BUDGET, metavar='MIB',
+                        help='Cap caches to MIB, track RSS / Qt objects, dump tracemalloc on SIGUSR1')
+    args, qt_args = parser.parse_known_args()
+    tracer.enabled = args.trace_startup
+
+    app = QApplication(sys.argv[:1] + qt_args)
+    tracer.mark('QApplication')
+    ex = CryptoDashboard(stream=args.stream or STREAM_MODE, record=args.record,
+                         replay=args.replay, replay_speed=args.replay_speed,
+                         low_power=args.low_power or LOW_POWER_MODE,
+                         metrics_port=args.metrics_port, metrics_file=args.metrics_file,
+                         currency=args.currency, memory_budget=args.memory_budget,
+                         depth=args.depth or DEPTH_MODE, timeframe=args.timeframe)
     if is_raspberry_pi():
         ex.showFullScreen()
     else:
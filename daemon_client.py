@@ -0,0 +1,76 @@
+import json
+import os
+import socket
+from PyQt5.QtCore import QThread, pyqtSignal
+from price_daemon import SOCKET_PATH, encode
+
+# VARIABLES
+CONNECT_TIMEOUT = 2
+RECONNECT_INTERVAL = 5
+
+# Lightweight client for price_daemon.py
+class DaemonFeed(QThread):
+    data_ready = pyqtSignal(dict)
+    connected = pyqtSignal()
+    disconnected = pyqtSignal()
+
+    def __init__(self, token_ids, socket_path=SOCKET_PATH, parent=None):
+        super().__init__(parent)
+        self.token_ids = list(token_ids)
+        self.socket_path = socket_path
+        self.running = False
+        self.sock = None
+
+    @staticmethod
+    def available(socket_path=SOCKET_PATH):
+        return os.path.exists(socket_path)
+
+    def run(self):
+        self.running = True
+        while self.running:
+            is_connected = False
+            try:
+                self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                self.sock.settimeout(CONNECT_TIMEOUT)
+                self.sock.connect(self.socket_path)
+                self.sock.settimeout(None)
+                self.sock.sendall(encode({'subscribe': self.token_ids}))
+                self.connected.emit()
+                is_connected = True
+                for line in self.sock.makefile('r', encoding='utf-8'):
+                    try:
+                        message = json.loads(line)
+                    except ValueError:
+                        continue
+                    snapshot = message.get('snapshot')
+                    if snapshot:
+                        # Stamp tickers with the daemon's fetch time so staleness and history stay right
+                        fetched = message.get('time')
+                        if fetched is not None:
+                            for data in snapshot.values():
+                                data['time'] = fetched
+                        self.data_ready.emit(snapshot)
+            except OSError as e:
+                if self.running:
+                    print(f"Price daemon unavailable: {e}")
+            finally:
+                if self.sock is not None:
+                    self.sock.close()
+                    self.sock = None
+                if is_connected and self.running:
+                    self.disconnected.emit()
+            # Wait before reconnecting (interruptible)
+            for _ in range(RECONNECT_INTERVAL * 10):
+                if not self.running:
+                    break
+                self.msleep(100)
+
+    def stop(self):
+        self.running = False
+        sock = self.sock
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        self.wait()
@@ -0,0 +1,103 @@
+import json
+import random
+import time
+from PyQt5.QtCore import QThread, pyqtSignal
+from binance_client import pair_symbol, get_depth, BinanceError
+from metrics import metrics
+from order_book import OrderBook, BookGapError, DEPTH_LEVELS, BOOK_LEVELS
+from price_stream import PriceStream, STREAM_URL, RECV_TIMEOUT, RECONNECT_MIN, RECONNECT_MAX
+import price_stream
+
+# VARIABLES
+DEPTH_SNAPSHOT_LIMIT = BOOK_LEVELS
+DEPTH_UPDATE_SPEED = '100ms'
+EMIT_INTERVAL = 0.25  # Seconds between depth_ready signals (the view never needs more)
+
+def depth_url(token_id, base_url=STREAM_URL):
+    return f'{base_url}/stream?streams={pair_symbol(token_id).lower()}@depth@{DEPTH_UPDATE_SPEED}'
+
+# Local order book for one token: one REST snapshot, then diff depth events
+class DepthStream(QThread):
+    depth_ready = pyqtSignal(str, list, list)
+
+    def __init__(self, token_id, levels=DEPTH_LEVELS, base_url=STREAM_URL, parent=None):
+        super().__init__(parent)
+        self.token_id = token_id
+        self.levels = levels
+        self.url = depth_url(token_id, base_url)
+        self.book = OrderBook(pair_symbol(token_id))
+        self.running = False
+        self.ws = None
+        self.last_emit = 0.0
+
+    available = staticmethod(PriceStream.available)
+
+    def run(self):
+        self.running = True
+        delay = RECONNECT_MIN
+        while self.running:
+            try:
+                # Events queue up in the socket while the snapshot is fetched
+                self.ws = price_stream.websocket.create_connection(self.url, timeout=RECV_TIMEOUT)
+                self.resync()
+                delay = RECONNECT_MIN
+                while self.running:
+                    self.handle_message(self.ws.recv())
+            except Exception as e:
+                if self.running:
+                    print(f"Depth stream error: {e}")
+            finally:
+                if self.ws is not None:
+                    self.ws.close()
+                    self.ws = None
+            if not self.running:
+                break
+            end = time.time() + random.uniform(delay / 2, delay)
+            while self.running and time.time() < end:
+                self.msleep(100)
+            delay = min(RECONNECT_MAX, delay * 2)
+
+    def resync(self):
+        try:
+            self.book.apply_snapshot(get_depth(self.token_id, DEPTH_SNAPSHOT_LIMIT))
+        except (BinanceError, ValueError, KeyError) as e:
+            raise ConnectionError(f"Order book snapshot failed: {e}") from e
+        self.emit_levels(force=True)
+
+    def handle_message(self, message):
+        if not message:
+            raise ConnectionError("Stream closed by server")
+        payload = json.loads(message)
+        event = payload.get('data', payload)
+        if event.get('e') != 'depthUpdate':
+            return
+        try:
+            if not self.book.apply_diff(event):
+                return
+        except BookGapError as e:
+            print(f"Order book out of sync, resyncing ({e})")
+            metrics.inc('cryptodash_depth_resyncs_total', {'symbol': self.book.symbol})
+            self.resync()
+            return
+        self.emit_levels()
+
+    # Only the top levels are copied out, at most every EMIT_INTERVAL
+    def emit_levels(self, force=False):
+        now = time.monotonic()
+        if not force and now - self.last_emit < EMIT_INTERVAL:
+            return
+        self.last_emit = now
+        bids, asks = self.book.top(self.levels)
+        self.depth_ready.emit(self.token_id, bids, asks)
+
+    # A snapshot request or connect in flight is not interrupted, so only quitting waits
+    def stop(self, wait=True):
+        self.running = False
+        ws = self.ws
+        if ws is not None:
+            try:
+                ws.shutdown()
+            except Exception:
+                pass
+        if wait:
+            self.wait()
@@ -0,0 +1,285 @@
+import argparse
+import base64
+import hashlib
+import json
+import os
+import random
+import socketserver
+import struct
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+# Local stand-in for the Binance API, replaying binance_demo.json shaped payloads
+BASE_PATH = os.path.dirname(os.path.realpath(__file__))
+DEMO_FILE = os.path.join(BASE_PATH, "binance_demo.json")
+WS_GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+INTERVAL_SECONDS = {'1m': 60, '5m': 300, '15m': 900, '1h': 3600, '4h': 14400, '1d': 86400, '1w': 604800, '1M': 2592000}
+
+def load_demo():
+    with open(DEMO_FILE, 'r') as f:
+        return json.load(f)
+
+# Fake Market (random walk around the demo ticker)
+class FakeMarket:
+    def __init__(self, seed=None):
+        self.demo = load_demo()
+        self.random = random.Random(seed)
+        self.prices = {}
+        self.books = {}  # symbol -> (bids, asks) as {price string: quantity string}
+        self.update_ids = {}  # symbol -> last depth update id (sequenced per symbol, like Binance)
+        self.lock = threading.Lock()
+
+    def ticker(self, symbol):
+        base = float(self.demo['lastPrice'])
+        price = self.prices.get(symbol, base)
+        price = max(0.0001, price * (1 + self.random.gauss(0, 0.0005)))
+        self.prices[symbol] = price
+        open_price = float(self.demo['openPrice'])
+        data = dict(self.demo)
+        data['symbol'] = symbol
+        data['lastPrice'] = f'{price:.8f}'
+        data['priceChange'] = f'{price - open_price:.8f}'
+        data['priceChangePercent'] = f'{(price - open_price) / open_price * 100:.3f}'
+        data['closeTime'] = int(time.time() * 1000)
+        return data
+
+    # Candles ending now in the /api/v3/klines array format
+    def klines(self, symbol, interval='1m', limit=500, start_time=None, end_time=None):
+        step = INTERVAL_SECONDS.get(interval, 60) * 1000
+        end = int(end_time if end_time is not None else time.time() * 1000) // step * step
+        if start_time is not None:
+            start = -(-int(start_time) // step) * step
+            count = min(limit, max(0, (end - start) // step + 1))
+        else:
+            count = limit
+            start = end - (count - 1) * step
+        price = self.prices.get(symbol, float(self.demo['lastPrice']))
+        candles = []
+        for i in range(count):
+            open_price = price
+            price = max(0.0001, price * (1 + self.random.gauss(0, 0.001)))
+            open_time = start + i * step
+            candles.append([open_time, f'{open_price:.8f}', f'{max(open_price, price):.8f}', f'{min(open_price, price):.8f}',
+                            f'{price:.8f}', '1.0', open_time + step - 1, f'{price:.8f}', 1, '0.5', f'{price / 2:.8f}', '0'])
+        return candles
+
+    # Order book around the current price, shared by /api/v3/depth and @depth events
+    def book(self, symbol):
+        if symbol not in self.books:
+            mid = self.prices.get(symbol, float(self.demo['lastPrice']))
+            step = mid * 0.0001
+            bids = {f'{mid - step * i:.2f}': f'{self.random.uniform(0.01, 3):.5f}' for i in range(1, 101)}
+            asks = {f'{mid + step * i:.2f}': f'{self.random.uniform(0.01, 3):.5f}' for i in range(1, 101)}
+            self.books[symbol] = (bids, asks)
+        return self.books[symbol]
+
+    def depth_snapshot(self, symbol, limit=100):
+        with self.lock:
+            bids, asks = self.book(symbol)
+            return {
+                'lastUpdateId': self.update_ids.setdefault(symbol, 1000),
+                'bids': sorted(bids.items(), key=lambda level: -float(level[0]))[:limit],
+                'asks': sorted(asks.items(), key=lambda level: float(level[0]))[:limit],
+            }
+
+    def depth_event(self, symbol):
+        with self.lock:
+            bids, asks = self.book(symbol)
+            changes = ([], [])
+            for side, levels in ((0, bids), (1, asks)):
+                best = sorted(levels, key=float, reverse=side == 0)[:10]
+                for _ in range(self.random.randint(1, 3)):
+                    price = self.random.choice(best) if best else None
+                    if price is None or self.random.random() < 0.3:
+                        # New level next to the touch, never through the other side (the book must not cross)
+                        reference = float(best[0]) if best else float(self.demo['lastPrice'])
+                        value = reference * (1 + (0.00005 if side else -0.00005) * self.random.randint(-1, 3))
+                        opposite = [float(level) for level in (asks if side == 0 else bids)]
+                        if side == 0 and opposite:
+                            value = min(value, min(opposite) - 0.01)
+                        elif side == 1 and opposite:
+                            value = max(value, max(opposite) + 0.01)
+                        if value <= 0:
+                            continue
+                        price = f'{value:.2f}'
+                    quantity = '0.00000' if self.random.random() < 0.25 else f'{self.random.uniform(0.01, 3):.5f}'
+                    if quantity == '0.00000':
+                        levels.pop(price, None)
+                    else:
+                        levels[price] = quantity
+                    changes[side].append([price, quantity])
+            first = self.update_ids.setdefault(symbol, 1000) + 1
+            self.update_ids[symbol] += self.random.randint(1, 3)
+            return {'e': 'depthUpdate', 'E': int(time.time() * 1000), 's': symbol,
+                    'U': first, 'u': self.update_ids[symbol], 'b': changes[0], 'a': changes[1]}
+
+    # Same ticker in the @ticker / @miniTicker stream event format
+    def stream_event(self, symbol, stream_type='ticker'):
+        data = self.ticker(symbol)
+        event = {
+            'e': '24hrMiniTicker' if stream_type == 'miniTicker' else '24hrTicker',
+            'E': data['closeTime'],
+            's': symbol,
+            'c': data['lastPrice'],
+            'o': data['openPrice'],
+            'h': data['highPrice'],
+            'l': data['lowPrice'],
+            'v': data['volume'],
+            'q': data['quoteVolume'],
+        }
+        if stream_type != 'miniTicker':
+            event.update({
+                'p': data['priceChange'],
+                'P': data['priceChangePercent'],
+                'w': data['weightedAvgPrice'],
+                'b': data['bidPrice'],
+                'B': data['bidQty'],
+                'a': data['askPrice'],
+                'A': data['askQty'],
+            })
+        return event
+
+# Minimal WebSocket Server (text frames only, server -> client)
+def ws_frame(payload):
+    data = payload.encode('utf-8')
+    length = len(data)
+    if length < 126:
+        header = struct.pack('!BB', 0x81, length)
+    elif length < 65536:
+        header = struct.pack('!BBH', 0x81, 126, length)
+    else:
+        header = struct.pack('!BBQ', 0x81, 127, length)
+    return header + data
+
+class StreamHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        request_line = self.rfile.readline().decode('latin-1').strip()
+        headers = {}
+        while True:
+            line = self.rfile.readline().decode('latin-1').strip()
+            if not line:
+                break
+            key, _, value = line.partition(':')
+            headers[key.strip().lower()] = value.strip()
+
+        key = headers.get('sec-websocket-key')
+        if not key:
+            self.wfile.write(b'HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\n\r\n')
+            return
+        accept = base64.b64encode(hashlib.sha1((key + WS_GUID).encode()).digest()).decode()
+        self.wfile.write((
+            'HTTP/1.1 101 Switching Protocols\r\n'
+            'Upgrade: websocket\r\n'
+            'Connection: Upgrade\r\n'
+            f'Sec-WebSocket-Accept: {accept}\r\n\r\n'
+        ).encode())
+
+        path = request_line.split(' ')[1] if ' ' in request_line else '/'
+        streams = parse_qs(urlparse(path).query).get('streams', [''])[0].split('/')
+        streams = [stream for stream in streams if '@' in stream]
+        try:
+            while True:
+                for stream in streams:
+                    symbol, stream_type = stream.split('@', 1)
+                    if stream_type.startswith('depth'):
+                        event = self.server.market.depth_event(symbol.upper())
+                    else:
+                        event = self.server.market.stream_event(symbol.upper(), stream_type)
+                    self.wfile.write(ws_frame(json.dumps({'stream': stream, 'data': event})))
+                self.wfile.flush()
+                time.sleep(self.server.interval)
+        except (BrokenPipeError, ConnectionResetError, OSError):
+            pass
+
+class StreamServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, interval=1.0, seed=None, market=None):
+        super().__init__(address, StreamHandler)
+        self.market = market or FakeMarket(seed)
+        self.interval = interval
+
+# Minimal REST Server (/api/v3/ticker/24hr and /api/v3/klines)
+class ApiHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        market = self.server.market
+        self.server.requests += 1
+        try:
+            if url.path == '/api/v3/ticker/24hr':
+                symbols = [query['symbol']] if 'symbol' in query else json.loads(query['symbols']) if 'symbols' in query else self.server.all_symbols
+                if any(symbol in self.server.invalid_symbols for symbol in symbols):
+                    self.send_json(400, {'code': -1121, 'msg': 'Invalid symbol.'})
+                    return
+                body = [market.ticker(symbol) for symbol in symbols]
+                if 'symbol' in query:
+                    body = body[0]
+            elif url.path == '/api/v3/depth':
+                body = market.depth_snapshot(query['symbol'], int(query.get('limit', 100)))
+            elif url.path == '/api/v3/klines':
+                body = market.klines(query['symbol'], query.get('interval', '1m'), int(query.get('limit', 500)),
+                                     query.get('startTime'), query.get('endTime'))
+            else:
+                self.send_json(404, {'code': -1, 'msg': 'Not found'})
+                return
+        except (KeyError, ValueError) as e:
+            self.send_json(400, {'code': -1100, 'msg': f'Bad request: {e}'})
+            return
+        self.send_json(200, body)
+
+    def send_json(self, status, body):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('X-MBX-USED-WEIGHT-1M', str(self.server.requests))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+class ApiServer(ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, seed=None, all_symbols=('BTCUSDT', 'ETHUSDT'), market=None, invalid_symbols=()):
+        super().__init__(address, ApiHandler)
+        self.market = market or FakeMarket(seed)
+        self.all_symbols = list(all_symbols)
+        self.invalid_symbols = set(invalid_symbols)  # Answered with 400 / -1121 like delisted symbols
+        self.requests = 0
+
+    @property
+    def url(self):
+        return f'http://{self.server_address[0]}:{self.server_port}'
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+# Main
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Fake Binance API for offline runs')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--ws-port', type=int, default=9443)
+    parser.add_argument('--http-port', type=int, help='Also serve the REST API on this port')
+    parser.add_argument('--interval', type=float, default=1.0, help='Seconds between stream events')
+    args = parser.parse_args()
+
+    market = FakeMarket()
+    if args.http_port is not None:
+        api = ApiServer((args.host, args.http_port), market=market).start()
+        print(f"Fake Binance API on {api.url}")
+    server = StreamServer((args.host, args.ws_port), args.interval, market=market)
+    print(f"Fake Binance stream on ws://{args.host}:{args.ws_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
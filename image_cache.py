@@ -0,0 +1,95 @@
+from collections import OrderedDict
+from PyQt5.QtGui import QPixmap
+from PyQt5.QtCore import Qt, QSize
+from asset_variants import AssetVariants, device_pixel_ratio, ASSET_VARIANTS
+
+# VARIABLES
+DEFAULT_BUDGET = 32 * 1024 * 1024  # Bytes of decoded pixels kept in memory
+
+def pixmap_bytes(pixmap):
+    return pixmap.width() * pixmap.height() * max(1, pixmap.depth()) // 8
+
+# Decoded & Scaled Image Cache (shared by crypto_dash.py and network.py)
+class ImageCache:
+    """LRU cache of decoded pixmaps keyed by (path, size, aspect mode, transform mode).
+
+    Scaled pixmaps come from the on-disk asset variants when present, and are
+    written there after the first scaling otherwise.
+    """
+
+    def __init__(self, budget=DEFAULT_BUDGET, variants=None):
+        self.budget = budget
+        self.used = 0
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.keep_sources = True  # Keep full resolution decodes for later rescaling
+        self.variants = variants
+
+    def key(self, path, size, aspect, transform):
+        if size is not None:
+            size = (size.width(), size.height()) if isinstance(size, QSize) else tuple(size)
+        return (path, size, int(aspect), int(transform))
+
+    def get(self, key):
+        pixmap = self.entries.get(key)
+        if pixmap is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+        return pixmap
+
+    def pixmap(self, path, size=None, aspect=Qt.KeepAspectRatio, transform=Qt.FastTransformation):
+        key = self.key(path, size, aspect, transform)
+        pixmap = self.get(key)
+        if pixmap is not None:
+            return pixmap
+
+        self.misses += 1
+        if size is None:
+            pixmap = QPixmap(path)
+        else:
+            # Scaled in physical pixels, so variants stay sharp on high DPI screens
+            ratio = device_pixel_ratio()
+            pixel_size = (round(key[1][0] * ratio), round(key[1][1] * ratio))
+            pixmap = self.variants.load(path, pixel_size, aspect, transform) if self.variants is not None else None
+            if pixmap is None:
+                # Without keep_sources the full resolution decode is released right after scaling
+                source = self.pixmap(path) if self.keep_sources else QPixmap(path)
+                pixmap = source.scaled(pixel_size[0], pixel_size[1], aspect, transform) if not source.isNull() else source
+                if self.variants is not None:
+                    self.variants.save(path, pixel_size, aspect, transform, pixmap)
+            pixmap.setDevicePixelRatio(ratio)
+        self.insert(key, pixmap)
+        return pixmap
+
+    def insert(self, key, pixmap):
+        cost = pixmap_bytes(pixmap)
+        if cost > self.budget:
+            return
+        self.entries[key] = pixmap
+        self.used += cost
+        self.evict()
+
+    # Drop least recently used entries until we fit in the budget
+    def evict(self):
+        while self.used > self.budget and self.entries:
+            _, pixmap = self.entries.popitem(last=False)
+            self.used -= pixmap_bytes(pixmap)
+
+    def preload(self, paths, size=None, aspect=Qt.KeepAspectRatio, transform=Qt.FastTransformation):
+        for path in paths:
+            self.pixmap(path, size, aspect, transform)
+
+    def set_budget(self, budget, keep_sources=True):
+        self.budget = budget
+        self.keep_sources = keep_sources
+        if not keep_sources:
+            for key in [key for key in self.entries if key[1] is None]:
+                self.used -= pixmap_bytes(self.entries.pop(key))
+        self.evict()
+
+    def clear(self):
+        self.entries.clear()
+        self.used = 0
+
+image_cache = ImageCache(variants=AssetVariants() if ASSET_VARIANTS else None)
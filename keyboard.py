@@ -0,0 +1,87 @@
+from PyQt5.QtWidgets import QWidget, QGridLayout, QPushButton, QStackedWidget, QSizePolicy
+from PyQt5.QtGui import QFont
+from PyQt5.QtCore import pyqtSignal
+
+# VARIABLES
+NORMAL_KEYS = [
+    ['1', '2', '3', '4', '5', '6', '7', '8', '9', '0'],
+    ['q', 'w', 'e', 'r', 't', 'y', 'u', 'i', 'o', 'p'],
+    ['a', 's', 'd', 'f', 'g', 'h', 'j', 'k', 'l', '*'],
+    ['z', 'x', 'c', 'v', 'b', 'n', 'm', ',', '.', '+'],
+    ['-', '_', '=', '$', '€', '/', '%', '#', '(', ')'],
+    ['@', 'capsL', 'Space', 'Del', 'Clear', 'Special', 'Enter']
+]
+SPECIAL_KEYS = [
+    ['1', '2', '3', '4', '5', '6', '7', '8', '9', '0'],
+    ['q', 'w', 'e', 'r', 't', 'y', 'u', 'i', 'o', 'p'],
+    ['á', 'é', 'í', 'ó', 'ú', 'ü', 'ñ', 'à', 'è', 'ì'],
+    ['â', 'ê', 'î', 'ô', 'û', 'ç', 'ä', 'ë', 'ï', 'ö'],
+    ['-', '_', '=', '$', '€', '/', '%', '#', '(', ')'],
+    ['@', 'capsL', 'Space', 'Del', 'Clear', 'Normal', 'Enter']
+]
+ACTION_KEYS = ('capsL', 'Space', 'Del', 'Clear', 'Special', 'Normal', 'Enter')
+KEY_STYLE = "Keyboard, KeyboardPage { background-color: transparent; } QPushButton { color: white; background-color: rgb(30,30,30); border: none; font-weight: bold; border-radius: 5px; padding: 8px; }"
+
+# One keyboard layout, built once
+class KeyboardPage(QWidget):
+    def __init__(self, keys, on_key, parent=None):
+        super().__init__(parent)
+        layout = QGridLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.letter_buttons = []
+        for i, row in enumerate(keys):
+            for j, key in enumerate(row):
+                button = QPushButton(key)
+                button.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Preferred)
+                button.clicked.connect(lambda checked, key=key: on_key(key))
+                layout.addWidget(button, i, j)
+                if key not in ACTION_KEYS and key.isalpha():
+                    self.letter_buttons.append(button)
+
+    def set_upper(self, upper):
+        for button in self.letter_buttons:
+            button.setText(button.text().upper() if upper else button.text().lower())
+
+# On-screen Keyboard (both layouts pooled in a stack, switched without rebuilding)
+class Keyboard(QStackedWidget):
+    enter_pressed = pyqtSignal()
+
+    def __init__(self, target=None, parent=None):
+        super().__init__(parent)
+        self.target = target
+        self.caps_lock_enabled = False
+        self.setStyleSheet(KEY_STYLE)
+        self.setFont(QFont('Montserrat Regular', 12))
+        self.normal_page = KeyboardPage(NORMAL_KEYS, self.key_pressed, self)
+        self.special_page = KeyboardPage(SPECIAL_KEYS, self.key_pressed, self)
+        self.addWidget(self.normal_page)
+        self.addWidget(self.special_page)
+
+    def set_target(self, line_edit):
+        self.target = line_edit
+
+    def key_pressed(self, key):
+        if key == 'capsL':
+            self.toggle_caps_lock()
+        elif key in ('Special', 'Normal'):
+            self.toggle_special_chars()
+        elif key == 'Enter':
+            self.enter_pressed.emit()
+        elif self.target is None:
+            return
+        elif key == 'Space':
+            self.target.insert(' ')
+        elif key == 'Del':
+            self.target.backspace()
+        elif key == 'Clear':
+            self.target.clear()
+        else:
+            self.target.insert(key.upper() if self.caps_lock_enabled else key)
+
+    def toggle_special_chars(self):
+        self.setCurrentWidget(self.normal_page if self.currentWidget() is self.special_page else self.special_page)
+
+    def toggle_caps_lock(self):
+        self.caps_lock_enabled = not self.caps_lock_enabled
+        self.normal_page.set_upper(self.caps_lock_enabled)
+        self.special_page.set_upper(self.caps_lock_enabled)
@@ -0,0 +1,85 @@
+import json
+import os
+import time
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+# Tape format: one JSON line per ticker update, appended as it happens
+#   [timestamp, {"btc": [price, 24h_change], "eth": [...]}]
+
+# Market Data Recorder
+class TapeRecorder:
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'a', buffering=1)
+
+    def record(self, snapshot, timestamp=None):
+        if not snapshot:
+            return
+        entry = [
+            round(time.time() if timestamp is None else timestamp, 3),
+            {token_id: [data['price'], data['24h_change']] for token_id, data in snapshot.items()}
+        ]
+        self.file.write(json.dumps(entry, separators=(',', ':')) + '\n')
+
+    def close(self):
+        self.file.close()
+
+def read_tape(path):
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                timestamp, tickers = json.loads(line)
+            except ValueError:
+                continue  # Partially written last line
+            yield timestamp, {
+                token_id: {'price': price, '24h_change': day_change, 'symbol': token_id.upper(), 'time': timestamp}
+                for token_id, (price, day_change) in tickers.items()
+            }
+
+# Market Data Replay (feeds a tape back at 1x or accelerated speed)
+class TapeReplay(QObject):
+    data_ready = pyqtSignal(dict)
+    finished = pyqtSignal()
+
+    def __init__(self, path, speed=1.0, loop=False, parent=None):
+        super().__init__(parent)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Tape not found: {path}")
+        self.path = path
+        self.speed = max(speed, 1e-6)
+        self.loop = loop
+        self.entries = None
+        self.next_entry = None
+        self.played = 0
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.emit_next)
+
+    def start(self):
+        self.entries = read_tape(self.path)
+        self.next_entry = next(self.entries, None)
+        self.timer.start(0)
+
+    def stop(self):
+        self.timer.stop()
+
+    def emit_next(self):
+        if self.next_entry is None:
+            if self.loop and self.played:
+                self.start()
+            else:
+                self.finished.emit()
+            return
+        timestamp, snapshot = self.next_entry
+        self.data_ready.emit(snapshot)
+        self.played += 1
+
+        self.next_entry = next(self.entries, None)
+        if self.next_entry is not None:
+            delay = (self.next_entry[0] - timestamp) / self.speed
+            self.timer.start(max(0, int(delay * 1000)))
+        else:
+            self.timer.start(0)
@@ -0,0 +1,138 @@
+import os
+import signal
+import time
+import tracemalloc
+from collections import Counter, deque
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import QObject, QTimer
+from image_cache import image_cache
+from metrics import metrics, process_rss
+from price_cache import CACHE_DIR
+
+# Memory budget mode for long running kiosks: capped caches, no kept full size
+# decodes, RSS / live Qt object tracking and tracemalloc dumps on SIGUSR1.
+
+# VARIABLES
+MEMORY_BUDGET = int(os.environ.get('CRYPTODASH_MEMORY_BUDGET', 0))  # MiB for caches, 0 = off
+IMAGE_CACHE_SHARE = 0.75  # Part of the budget for decoded images, the rest is left to text/other caches
+TEXT_CACHE_SIZE = 2  # Rendered texts kept per ShadowLabel in budget mode
+SAMPLE_INTERVAL = 60  # Seconds between RSS / object count samples
+SAMPLE_HISTORY = 24 * 60  # Samples kept (one day at the default interval)
+GROWTH_WARNING = 8 * 1024 * 1024  # Bytes per hour of sustained RSS growth worth a warning
+TOP_CLASSES = 10  # Qt classes exported as gauges
+TRACEMALLOC_FRAMES = 10
+DUMP_DIR = os.path.join(CACHE_DIR, 'memory')
+DUMP_SIGNAL = getattr(signal, 'SIGUSR1', None)  # Missing on Windows, dumps are then unavailable
+
+def apply_budget(budget_mb):
+    """Caps every cache to fit budget_mb and stops keeping full resolution decodes."""
+    from shadow_label import ShadowLabel
+    image_cache.set_budget(int(budget_mb * 1024 * 1024 * IMAGE_CACHE_SHARE), keep_sources=False)
+    ShadowLabel.cache_size = TEXT_CACHE_SIZE
+    print(f"Memory budget mode: {budget_mb} MiB ({image_cache.budget // 1024} KiB of images)")
+
+# Live QObjects by class (widgets, timers, threads, effects... owned by top level windows)
+def qt_object_counts():
+    counts = Counter()
+    app = QApplication.instance()
+    if app is None:
+        return counts
+    for widget in app.topLevelWidgets():
+        counts[type(widget).__name__] += 1
+        for child in widget.findChildren(QObject):
+            counts[type(child).__name__] += 1
+    for child in app.findChildren(QObject):
+        counts[type(child).__name__] += 1
+    return counts
+
+# Memory Monitor
+class MemoryMonitor(QObject):
+    def __init__(self, interval=SAMPLE_INTERVAL, parent=None):
+        super().__init__(parent)
+        self.samples = deque(maxlen=SAMPLE_HISTORY)  # (time, rss, qt objects)
+        self.previous_snapshot = None
+        self.dump_requested = False
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.sample)
+        self.timer.start(int(interval * 1000))
+        # Python signal handlers only run when the interpreter gets control back
+        self.signal_timer = QTimer(self)
+        self.signal_timer.timeout.connect(self.check_dump)
+        self.signal_timer.start(1000)
+        if DUMP_SIGNAL is not None:
+            signal.signal(DUMP_SIGNAL, self.on_signal)
+        metrics.describe('cryptodash_qt_objects', 'gauge', 'Live Qt objects per class')
+        metrics.describe('cryptodash_rss_growth_bytes_per_hour', 'gauge', 'RSS growth over the sampled history')
+        self.sample()
+
+    def sample(self):
+        counts = qt_object_counts()
+        rss = process_rss()
+        total = sum(counts.values())
+        self.samples.append((time.time(), rss, total))
+        metrics.set('cryptodash_qt_objects', total, {'class': 'total'})
+        for name, count in counts.most_common(TOP_CLASSES):
+            metrics.set('cryptodash_qt_objects', count, {'class': name})
+        growth = self.growth()
+        metrics.set('cryptodash_rss_growth_bytes_per_hour', round(growth))
+        if growth > GROWTH_WARNING and len(self.samples) >= 10:
+            print(f"Memory: RSS {rss / 2**20:.1f} MiB, growing {growth / 2**20:.1f} MiB/h, {total} Qt objects")
+
+    # Least squares slope of RSS over the sampled history
+    def growth(self):
+        if len(self.samples) < 2:
+            return 0.0
+        times = [sample[0] for sample in self.samples]
+        values = [sample[1] for sample in self.samples]
+        mean_time = sum(times) / len(times)
+        mean_value = sum(values) / len(values)
+        variance = sum((t - mean_time) ** 2 for t in times)
+        if not variance:
+            return 0.0
+        slope = sum((t - mean_time) * (v - mean_value) for t, v in zip(times, values)) / variance
+        return slope * 3600
+
+    def on_signal(self, signum, frame):
+        self.dump_requested = True
+
+    def check_dump(self):
+        if self.dump_requested:
+            self.dump_requested = False
+            self.dump()
+
+    # First signal starts tracing, every following one writes a snapshot (diffed with the previous)
+    def dump(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+            print(f"tracemalloc started, send signal {DUMP_SIGNAL.name} again to dump")
+            return None
+        os.makedirs(DUMP_DIR, exist_ok=True)
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        ))
+        snapshot.dump(os.path.join(DUMP_DIR, f'tracemalloc-{stamp}.snapshot'))
+        report_path = os.path.join(DUMP_DIR, f'tracemalloc-{stamp}.txt')
+        with open(report_path, 'w') as f:
+            f.write(f'RSS {process_rss()} bytes, growth {self.growth():.0f} bytes/h\n\n')
+            f.write('Qt objects:\n')
+            for name, count in qt_object_counts().most_common():
+                f.write(f'  {count:6} {name}\n')
+            f.write('\nTop allocations:\n')
+            for stat in snapshot.statistics('lineno')[:25]:
+                f.write(f'  {stat}\n')
+            if self.previous_snapshot is not None:
+                f.write('\nGrowth since previous dump:\n')
+                for stat in snapshot.compare_to(self.previous_snapshot, 'lineno')[:25]:
+                    f.write(f'  {stat}\n')
+            f.write('\nRSS history (time, rss, qt objects):\n')
+            for sample in self.samples:
+                f.write(f'  {sample[0]:.0f} {sample[1]} {sample[2]}\n')
+        self.previous_snapshot = snapshot
+        print(f"Memory report written to {report_path}")
+        return report_path
+
+def start_memory_budget(budget_mb, parent=None):
+    apply_budget(budget_mb)
+    return MemoryMonitor(parent=parent)
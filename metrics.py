@@ -0,0 +1,191 @@
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# VARIABLES
+METRICS_PORT = int(os.environ.get('CRYPTODASH_METRICS_PORT', 0))  # 0 = disabled
+METRICS_FILE = os.environ.get('CRYPTODASH_METRICS_FILE', '')
+METRICS_FILE_INTERVAL = 15
+METRICS_FILE_MODE = 0o644  # Readable by collectors running as another user
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+def label_key(labels):
+    return tuple(sorted(labels.items())) if labels else ()
+
+def format_labels(key, extra=None):
+    items = list(key) + (extra or [])
+    if not items:
+        return ''
+    return '{' + ','.join(f'{name}="{value}"' for name, value in items) + '}'
+
+# Process resident memory in bytes
+def process_rss():
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+# Metrics Registry (Prometheus text format or JSON)
+class Metrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.types = {}
+        self.help = {}
+        self.values = {}  # name -> {label_key: value or Histogram}
+        self.callbacks = []
+
+    def describe(self, name, metric_type, help_text=''):
+        self.types.setdefault(name, metric_type)
+        if help_text:
+            self.help[name] = help_text
+
+    def inc(self, name, labels=None, amount=1):
+        with self.lock:
+            self.types.setdefault(name, 'counter')
+            series = self.values.setdefault(name, {})
+            key = label_key(labels)
+            series[key] = series.get(key, 0) + amount
+
+    def set(self, name, value, labels=None):
+        with self.lock:
+            self.types.setdefault(name, 'gauge')
+            self.values.setdefault(name, {})[label_key(labels)] = value
+
+    def observe(self, name, value, labels=None):
+        with self.lock:
+            self.types.setdefault(name, 'histogram')
+            series = self.values.setdefault(name, {})
+            key = label_key(labels)
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(value)
+
+    @contextmanager
+    def time(self, name, labels=None):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, labels)
+
+    # Callbacks refresh gauges (staleness, RSS...) right before export
+    def register_callback(self, callback):
+        self.callbacks.append(callback)
+
+    def collect(self):
+        for callback in self.callbacks:
+            try:
+                callback(self)
+            except Exception as e:
+                print(f"Metrics callback error: {e}")
+
+    def render_prometheus(self):
+        self.collect()
+        lines = []
+        with self.lock:
+            for name in sorted(self.values):
+                metric_type = self.types[name]
+                if name in self.help:
+                    lines.append(f'# HELP {name} {self.help[name]}')
+                lines.append(f'# TYPE {name} {metric_type}')
+                for key, value in sorted(self.values[name].items()):
+                    if metric_type != 'histogram':
+                        lines.append(f'{name}{format_labels(key)} {value}')
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(list(value.buckets) + ['+Inf'], value.counts):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{format_labels(key, [("le", bound)])} {cumulative}')
+                    lines.append(f'{name}_sum{format_labels(key)} {value.sum}')
+                    lines.append(f'{name}_count{format_labels(key)} {value.count}')
+        return '\n'.join(lines) + '\n'
+
+    def to_dict(self):
+        self.collect()
+        result = {}
+        with self.lock:
+            for name, series in self.values.items():
+                entries = []
+                for key, value in series.items():
+                    entry = {'labels': dict(key)}
+                    if isinstance(value, Histogram):
+                        entry.update({'buckets': dict(zip([str(b) for b in value.buckets] + ['+Inf'], value.counts)),
+                                      'sum': value.sum, 'count': value.count})
+                    else:
+                        entry['value'] = value
+                    entries.append(entry)
+                result[name] = {'type': self.types[name], 'series': entries}
+        return result
+
+metrics = Metrics()
+metrics.describe('cryptodash_fetch_seconds', 'histogram', 'Ticker fetch latency per symbol')
+metrics.describe('cryptodash_fetch_errors_total', 'counter', 'Failed Binance requests')
+metrics.describe('cryptodash_fetch_retries_total', 'counter', 'Retried Binance requests')
+metrics.describe('cryptodash_data_staleness_seconds', 'gauge', 'Seconds since the last price update per symbol')
+metrics.describe('cryptodash_event_loop_lag_seconds', 'histogram', 'Delay of a periodic Qt timer versus its schedule')
+metrics.describe('cryptodash_section_seconds', 'histogram', 'Time spent in hot code paths')
+metrics.describe('cryptodash_alerts_total', 'counter', 'Price alerts fired')
+metrics.describe('cryptodash_depth_resyncs_total', 'counter', 'Order book resyncs after a sequence gap')
+metrics.describe('cryptodash_candle_requests_total', 'counter', 'Klines requests made to fill gaps in the candle store')
+metrics.describe('cryptodash_process_rss_bytes', 'gauge', 'Resident set size of the process')
+metrics.register_callback(lambda registry: registry.set('cryptodash_process_rss_bytes', process_rss()))
+
+# HTTP Endpoint (/metrics), http.server is only imported when it is enabled
+def start_http_server(port, host='127.0.0.1'):
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] not in ('/', '/metrics'):
+                self.send_error(404)
+                return
+            body = metrics.render_prometheus().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"Metrics on http://{host}:{server.server_port}/metrics")
+    return server
+
+# Periodic JSON File
+def start_json_writer(path, interval=METRICS_FILE_INTERVAL):
+    from price_cache import atomic_write
+
+    def write_loop():
+        while True:
+            try:
+                atomic_write(os.path.abspath(path), json.dumps({'time': time.time(), 'metrics': metrics.to_dict()}),
+                             METRICS_FILE_MODE)
+            except OSError as e:
+                print(f"Error writing metrics file: {e}")
+            time.sleep(interval)
+
+    thread = threading.Thread(target=write_loop, daemon=True)
+    thread.start()
+    return thread
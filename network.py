@@ -2,20 +2,27 @@ import sys
 import os
 import subprocess
 import socket
-from PyQt5.QtWidgets import (QApplication, QWidget, QVBoxLayout, QPushButton, QLabel, QListWidget, QLineEdit, QMessageBox, QGridLayout)
-from PyQt5.QtGui import QFont, QFontDatabase, QPainter, QImage
-from PyQt5.QtCore import Qt, QTimer
-from pywifi import PyWiFi, const, Profile
+import time
+from PyQt5.QtWidgets import (QApplication, QWidget, QVBoxLayout, QPushButton, QLabel, QListWidget, QListWidgetItem, QLineEdit, QMessageBox, QGridLayout)
+from PyQt5.QtGui import QFont, QFontDatabase, QPainter
+from PyQt5.QtCore import Qt, QTimer, QThread, pyqtSignal
 import json
-from screeninfo import get_monitors, ScreenInfoError
+from image_cache import image_cache
+from keyboard import Keyboard
+from wifi_backend import LocalWiFi, WiFiError, dedupe_networks
 
 # Constants and global variables
 BASE_PATH = os.path.dirname(os.path.realpath(__file__))
 WIFI_CONFIG_FILE = os.path.join(BASE_PATH, "wifi_config.json")
-WIFI_INTERFACE_INDEX = 1
+BACKGROUND_IMAGE = os.path.join(BASE_PATH, "images/backgrounds/img11.jpg")
+MEMORY_BUDGET = int(os.environ.get('CRYPTODASH_MEMORY_BUDGET', 0))  # MiB, see memory_budget.py
+SCAN_POLL_INTERVAL = 500  # ms between scan result polls
+SCAN_TIMEOUT = 8  # seconds before giving up on a scan settling
+SignalRole = Qt.UserRole + 1
 
 def get_screen_resolution():
     """Returns the resolution of the primary monitor."""
+    from screeninfo import get_monitors, ScreenInfoError
     try:
         monitors = get_monitors()
         if monitors:
@@ -25,45 +32,116 @@ def get_screen_resolution():
         print(f"ScreenInfoError: {e}")
     return 720, 480
 
-def configure_wifi(ssid, password):
-    config_lines = [
-        'ctrl_interface=DIR=/var/run/wpa_supplicant GROUP=netdev',
-        'update_config=1',
-        'country=ES',
-        '\n',
-        'network={',
-        '\tssid="{}"'.format(ssid),
-        '\tpsk="{}"'.format(password),
-        '}'
-        ]
-    config = '\n'.join(config_lines)
-    
-    # Give access and writing permissions. May have to do this manually beforehand
-    os.popen("sudo chmod a+w /etc/wpa_supplicant/wpa_supplicant.conf")
-    
-    # Writing to file
-    with open("/etc/wpa_supplicant/wpa_supplicant.conf", "w") as wifi:
-        wifi.write(config)
-    
-    print("Wifi config added. Refreshing configs")
-    # Refresh configs
-    os.popen("sudo wpa_cli -i wlan0 reconfigure")
-
-width, height = get_screen_resolution()
-os.environ['XDG_RUNTIME_DIR'] = "/tmp/runtime-root"
+# Background Scan (the backend keeps a single interface handle)
+class ScanWorker(QThread):
+    networks_ready = pyqtSignal(list)
+
+    def __init__(self, backend, parent=None):
+        super().__init__(parent)
+        self.backend = backend
+
+    def run(self):
+        try:
+            self.backend.start_scan()
+            deadline = time.monotonic() + SCAN_TIMEOUT
+            previous = None
+            # Poll until two consecutive non-empty results agree
+            while not self.isInterruptionRequested() and time.monotonic() < deadline:
+                self.msleep(SCAN_POLL_INTERVAL)
+                networks = dedupe_networks(self.backend.scan_results())
+                if networks != previous:
+                    self.networks_ready.emit(networks)
+                elif networks:
+                    break
+                previous = networks
+        except WiFiError as e:
+            print(f"Error scanning WiFi networks: {e}")
+
+# Saves wpa_supplicant config off the GUI thread (file write + wpa_cli reconfigure)
+class ConfigWorker(QThread):
+    def __init__(self, backend, ssid, password, parent=None):
+        super().__init__(parent)
+        self.backend = backend
+        self.ssid = ssid
+        self.password = password
+
+    def run(self):
+        try:
+            self.backend.configure(self.ssid, self.password)
+        except WiFiError as e:
+            print(f"Error saving WiFi config: {e}")
+
+# Connect and status calls may queue behind a slow configure in the helper, so they run here too
+class ConnectWorker(QThread):
+    connect_done = pyqtSignal(str, str)  # ssid, error ('' on success)
+
+    def __init__(self, backend, ssid, password, parent=None):
+        super().__init__(parent)
+        self.backend = backend
+        self.ssid = ssid
+        self.password = password
+
+    def run(self):
+        try:
+            self.backend.connect(self.ssid, self.password)
+        except WiFiError as e:
+            self.connect_done.emit(self.ssid, str(e) or 'WiFi error')
+            return
+        self.connect_done.emit(self.ssid, '')
+
+class StatusWorker(QThread):
+    status_ready = pyqtSignal(bool, str)  # connected, ssid
+
+    def __init__(self, backend, parent=None):
+        super().__init__(parent)
+        self.backend = backend
+
+    def run(self):
+        try:
+            connected = self.backend.status()
+        except WiFiError as e:
+            print(f"Error checking WiFi status: {e}")
+            connected = False
+        self.status_ready.emit(connected, get_connected_wifi_ssid() if connected else '')
+
+def get_connected_wifi_ssid():
+    try:
+        result = subprocess.run(['iwgetid', '-r'], capture_output=True, text=True)
+        return result.stdout.strip() if result.returncode == 0 else "Unknown"
+    except Exception as e:
+        print(f"Error getting connected SSID: {e}")
+        return "Unknown"
+
+# Network list entry ordered by signal strength
+class NetworkItem(QListWidgetItem):
+    def __lt__(self, other):
+        return self.data(SignalRole) < other.data(SignalRole)
 
 class WiFiManager(QWidget):
-    def __init__(self):
-        super().__init__()
-        self.caps_lock_enabled = False
-        self.is_special = False
+    closed = pyqtSignal()
+
+    def __init__(self, parent=None, backend=None):
+        """Standalone full screen app, or an in-process panel when a parent is given.
+
+        backend provides the WiFi operations (LocalWiFi or HelperWiFi).
+        """
+        super().__init__(parent)
+        self.embedded = parent is not None
+        self.backend = backend if backend is not None else LocalWiFi()
+        self.network_items = {}  # ssid -> NetworkItem
+        self.scan_worker = None
+        self.config_worker = None
+        self.connect_worker = None
+        self.status_worker = None
+        self.pending_config = None  # (ssid, password) to save once connected
         self.selected_input = None
         self.timer = QTimer()
         self.initUI()
 
     def initUI(self):
         self.setWindowTitle('WiFi Manager')
-        self.setWindowFlags(Qt.FramelessWindowHint)
+        if not self.embedded:
+            self.setWindowFlags(Qt.FramelessWindowHint)
         self.setStyleSheet("background-color: gray; color: white;")
         QFontDatabase.addApplicationFont(os.path.join(BASE_PATH, "fonts/Montserrat-Regular.ttf"))
 
@@ -78,11 +156,9 @@ class WiFiManager(QWidget):
         self.close_button = self.create_button('CLOSE', self.close_app, "rgb(60,60,60)")
 
         self.setup_layout(layout)
-        self.adjust_elements_to_screen()
-        self.showFullScreen()
-
-        self.refresh_networks()
-        QTimer.singleShot(3000, self.refresh_networks)
+        if not self.embedded:
+            self.adjust_elements_to_screen()
+            self.showFullScreen()
 
         # Conectar el evento de selección de la lista al método para enfocar el campo de contraseña
         self.network_list.itemSelectionChanged.connect(self.on_network_selected)
@@ -129,96 +205,64 @@ class WiFiManager(QWidget):
 
         self.setLayout(layout)
         
-        self.keyboard_layout = QGridLayout()
-        self.add_keys()
-        layout.addLayout(self.keyboard_layout)
-
-    def add_keys(self):
-        self.normal_keys = [
-            ['1', '2', '3', '4', '5', '6', '7', '8', '9', '0'],
-            ['q', 'w', 'e', 'r', 't', 'y', 'u', 'i', 'o', 'p'],
-            ['a', 's', 'd', 'f', 'g', 'h', 'j', 'k', 'l', '*'],
-            ['z', 'x', 'c', 'v', 'b', 'n', 'm', ',', '.', '+'],
-            ['-', '_', '=', '$', '€', '/', '%', '#', '(', ')'],
-            ['@', 'capsL', 'Space', 'Del', 'Clear', 'Special', 'Enter']
-        ]
-        self.special_keys = [
-            ['1', '2', '3', '4', '5', '6', '7', '8', '9', '0'],
-            ['q', 'w', 'e', 'r', 't', 'y', 'u', 'i', 'o', 'p'],
-            ['á', 'é', 'í', 'ó', 'ú', 'ü', 'ñ', 'à', 'è', 'ì'],
-            ['â', 'ê', 'î', 'ô', 'û', 'ç', 'ä', 'ë', 'ï', 'ö'],
-            ['-', '_', '=', '$', '€', '/', '%', '#', '(', ')'],
-            ['@', 'CapsL', 'Space', 'Del', 'Clear', 'Normal', 'Enter']
-        ]
-        self.load_keys(self.normal_keys)
-
-    def load_keys(self, keys):
-        self.keyboard_layout.setParent(None)
-        self.keyboard_layout = QGridLayout()
-        for i, row in enumerate(keys):
-            for j, key in enumerate(row):
-                button = QPushButton(key)
-                button.setStyleSheet("color: white; background-color: rgb(30,30,30); border: none; font-weight: bold; border-radius: 5px; padding: 8px;")
-                button.setFont(QFont('Montserrat Regular', 12))
-                button.clicked.connect(lambda ch, key=key: self.key_pressed(key))
-                self.keyboard_layout.addWidget(button, i, j)
-
-    def key_pressed(self, key):
-        if key == 'Space':
-            self.selected_input.insert(' ')
-        elif key == 'Del':
-            self.selected_input.backspace()
-        elif key == 'Clear':
-            self.selected_input.clear()
-        elif key == 'Enter':
-            self.connect_to_network()
-        elif key == 'capsL':
-            self.toggle_caps_lock()
-        elif key in ['Special', 'Normal']:
-            self.toggle_special_chars()
-        else:
-            self.selected_input.insert(key.upper() if self.caps_lock_enabled else key)
-
-    def toggle_special_chars(self):
-        self.is_special = not self.is_special
-        self.load_keys(self.special_keys if self.is_special else self.normal_keys)
-
-    def toggle_caps_lock(self):
-        self.caps_lock_enabled = not self.caps_lock_enabled
-        self.update_keys_case()
-
-    def update_keys_case(self):
-        for i in range(self.keyboard_layout.count()):
-            button = self.keyboard_layout.itemAt(i).widget()
-            key = button.text()
-            if key.isalpha():
-                button.setText(key.upper() if self.caps_lock_enabled else key.lower())
+        self.keyboard = Keyboard(self.password_input, self)
+        self.keyboard.enter_pressed.connect(self.connect_to_network)
+        layout.addWidget(self.keyboard)
 
     def adjust_elements_to_screen(self):
+        width, height = get_screen_resolution()
         self.setGeometry(0, 0, width, height)
 
+    # Scan every time the panel is opened
+    def showEvent(self, event):
+        super().showEvent(event)
+        QTimer.singleShot(0, self.refresh_networks)
+
     def paintEvent(self, event):
         painter = QPainter(self)
-        image = QImage(os.path.join(BASE_PATH, "images/backgrounds/img11.jpg"))
-        painter.drawImage(self.rect(), image)
+        pixmap = image_cache.pixmap(BACKGROUND_IMAGE, self.size(), Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+        painter.drawPixmap(self.rect(), pixmap)
 
     def input_focused(self, input_widget):
         self.password_input.setStyleSheet("color: white; border: none; padding: 5px; background-color: rgba(0,0,0,180);")
         self.selected_input = input_widget
         self.selected_input.setStyleSheet("color: #ADE4F7; border: none; padding: 5px; background-color: rgba(0,0,0,180);")
+        self.keyboard.set_target(input_widget)
 
     def refresh_networks(self):
-        networks = self.scan_wifi_networks()
-        self.network_list.clear()
-        self.network_list.addItems(networks)
-        self.check_connection()
-
-    def scan_wifi_networks(self):
-        wifi = PyWiFi()
-        iface = wifi.interfaces()[WIFI_INTERFACE_INDEX]
-        iface.scan()
-        result = iface.scan_results()
-        return [network.ssid for network in result]
+        if self.scan_worker is not None and self.scan_worker.isRunning():
+            return
+        self.scan_worker = ScanWorker(self.backend, self)
+        self.scan_worker.networks_ready.connect(self.update_networks)
+        self.scan_worker.finished.connect(self.check_connection)
+        self.scan_worker.start()
+
+    # Apply only additions/removals, keeping the selection on surviving items
+    def update_networks(self, networks):
+        signals = {network['ssid']: network['signal'] for network in networks}
+        for ssid in list(self.network_items):
+            if ssid not in signals:
+                item = self.network_items.pop(ssid)
+                self.network_list.takeItem(self.network_list.row(item))
+        for ssid, signal in signals.items():
+            item = self.network_items.get(ssid)
+            if item is None:
+                item = self.network_items[ssid] = NetworkItem(ssid)
+                self.network_list.addItem(item)
+            item.setData(SignalRole, signal)
+        self.network_list.sortItems(Qt.DescendingOrder)
+
+    def stop_scan(self):
+        if self.scan_worker is not None:
+            self.scan_worker.requestInterruption()
+            self.scan_worker.wait()
+
+    # Before quitting: no worker may outlive the panel
+    def stop_workers(self):
+        self.stop_scan()
+        for worker in (self.connect_worker, self.status_worker, self.config_worker):
+            if worker is not None:
+                worker.wait()
 
     def on_network_selected(self):
         self.password_input.setFocus()
@@ -236,40 +280,49 @@ class WiFiManager(QWidget):
             self.show_alert_message("Please select a network from the list.", QMessageBox.Warning)
 
     def attempt_connection(self, ssid, password):
-        wifi = PyWiFi()
-        iface = wifi.interfaces()[WIFI_INTERFACE_INDEX]
-        profile = Profile()
-        profile.ssid = ssid
-        profile.auth = const.AUTH_ALG_OPEN
-        profile.akm.append(const.AKM_TYPE_WPA2PSK)
-        profile.cipher = const.CIPHER_TYPE_CCMP
-        profile.key = password
-        iface.remove_all_network_profiles()
-        tmp_profile = iface.add_network_profile(profile)
-        iface.connect(tmp_profile)
+        if self.connect_worker is not None and self.connect_worker.isRunning():
+            return
+        self.pending_config = (ssid, password)
+        self.connect_worker = ConnectWorker(self.backend, ssid, password, self)
+        self.connect_worker.connect_done.connect(self.on_connect_done)
+        self.connect_worker.start()
+
+    def on_connect_done(self, ssid, error):
+        if error:
+            self.pending_config = None
+            self.show_alert_message(f'Unable to connect: {error}', QMessageBox.Warning)
+            return
         self.show_alert_message(f'Attempting to connect to {ssid}...', QMessageBox.Information)
         QTimer.singleShot(1000, self.check_connection)
         QTimer.singleShot(5000, self.check_connection)
 
     def check_connection(self):
-        wifi = PyWiFi()
-        iface = wifi.interfaces()[WIFI_INTERFACE_INDEX]
-        status = iface.status()
-        if status == const.IFACE_CONNECTED:
-            connected_network = self.get_connected_wifi_ssid()
-            ip_address = self.get_ip_address()
+        if self.status_worker is not None and self.status_worker.isRunning():
+            return  # The running check reports the current state
+        self.status_worker = StatusWorker(self.backend, self)
+        self.status_worker.status_ready.connect(self.on_status_ready)
+        self.status_worker.start()
+
+    def on_status_ready(self, connected, connected_network):
+        if connected:
             self.status_label.setStyleSheet("color: rgb(0,255,0); background-color: rgba(0,0,0,0);")
             self.status_label.setText(f"WIFI CONNECTED TO {connected_network}")
-            # Save the successful connection
-            selected_items = self.network_list.selectedItems()
-            if selected_items:
-                ssid = selected_items[0].text()
-                password = self.password_input.text()
-                configure_wifi(ssid, password)
+            # Save the successful connection (once per attempt)
+            if self.pending_config is not None:
+                self.save_config(*self.pending_config)
+                self.pending_config = None
         else:
             self.status_label.setStyleSheet("color: red; background-color: rgba(0,0,0,0);")
             self.status_label.setText("WIFI NOT CONNECTED")
 
+    def save_config(self, ssid, password):
+        if self.config_worker is not None and self.config_worker.isRunning():
+            # Saved when the running write finishes
+            self.config_worker.finished.connect(lambda: self.save_config(ssid, password))
+            return
+        self.config_worker = ConfigWorker(self.backend, ssid, password, self)
+        self.config_worker.start()
+
     def get_ip_address(self):
         try:
             s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
@@ -282,16 +335,16 @@ class WiFiManager(QWidget):
             print(f"Error getting IP address: {e}")
             return "0.0.0.0"
 
-    def get_connected_wifi_ssid(self):
-        try:
-            result = subprocess.run(['iwgetid', '-r'], capture_output=True, text=True)
-            return result.stdout.strip() if result.returncode == 0 else "Unknown"
-        except Exception as e:
-            print(f"Error getting connected SSID: {e}")
-            return "Unknown"
-
     def close_app(self):
-        QApplication.quit()
+        if self.embedded:
+            # Don't block the dashboard on a scan, it winds down on its own
+            if self.scan_worker is not None:
+                self.scan_worker.requestInterruption()
+            self.hide()
+            self.closed.emit()
+        else:
+            self.stop_workers()
+            QApplication.quit()
 
     def show_alert_message(self, message, icon):
         msg_box = QMessageBox()
@@ -308,6 +361,11 @@ class WiFiManager(QWidget):
         msg_box.exec()
 
 if __name__ == '__main__':
+    os.environ['XDG_RUNTIME_DIR'] = "/tmp/runtime-root"
     app = QApplication(sys.argv)
+    memory_monitor = None
+    if MEMORY_BUDGET:
+        from memory_budget import start_memory_budget
+        memory_monitor = start_memory_budget(MEMORY_BUDGET)
     ex = WiFiManager()
     sys.exit(app.exec_())
@@ -0,0 +1,141 @@
+from operator import neg
+from sortedcontainers import SortedDict
+from PyQt5.QtWidgets import QWidget
+from PyQt5.QtGui import QPainter, QColor, QFont
+from PyQt5.QtCore import Qt, QRectF
+
+# VARIABLES
+DEPTH_LEVELS = 8  # Levels per side shown in the depth view
+BOOK_LEVELS = 1000  # Levels per side kept in the local book (the snapshot depth)
+
+class BookGapError(Exception):
+    pass
+
+# One side of the book: price -> quantity, kept sorted
+class BookSide:
+    """Price levels in a SortedDict, best level first (highest bid / lowest ask).
+
+    Updates are O(log n). At most max_levels are kept; levels beyond the
+    snapshot depth are trimmed from the far end so the book cannot grow.
+    """
+
+    def __init__(self, descending, max_levels=BOOK_LEVELS):
+        self.max_levels = max_levels
+        self.levels = SortedDict(neg) if descending else SortedDict()
+
+    def __len__(self):
+        return len(self.levels)
+
+    def set(self, price, quantity):
+        if quantity <= 0:
+            self.levels.pop(price, None)
+            return
+        self.levels[price] = quantity
+        if len(self.levels) > self.max_levels:
+            self.levels.popitem(-1)
+
+    def clear(self):
+        self.levels.clear()
+
+    def best(self):
+        return self.levels.peekitem(0)[0] if self.levels else None
+
+    def top(self, count):
+        return list(self.levels.items()[:count])
+
+# Local Order Book (REST snapshot + diff depth events, Binance sequencing rules)
+class OrderBook:
+    def __init__(self, symbol, max_levels=BOOK_LEVELS):
+        self.symbol = symbol
+        self.bids = BookSide(descending=True, max_levels=max_levels)
+        self.asks = BookSide(descending=False, max_levels=max_levels)
+        self.last_update_id = None
+        self.synced = False
+
+    def apply_snapshot(self, snapshot):
+        self.bids.clear()
+        self.asks.clear()
+        for price, quantity in snapshot['bids']:
+            self.bids.set(float(price), float(quantity))
+        for price, quantity in snapshot['asks']:
+            self.asks.set(float(price), float(quantity))
+        self.last_update_id = snapshot['lastUpdateId']
+        self.synced = False  # Until the first event bridging the snapshot
+
+    def apply_diff(self, event):
+        """Applies a depthUpdate event. Returns False for events already in the snapshot.
+
+        Raises BookGapError when an update is missing; the book must be resynced.
+        """
+        first, last = event['U'], event['u']
+        if self.last_update_id is None:
+            raise BookGapError(f"{self.symbol}: no snapshot")
+        if last <= self.last_update_id:
+            return False
+        if self.synced:
+            if first != self.last_update_id + 1:
+                raise BookGapError(f"{self.symbol}: expected update {self.last_update_id + 1}, got {first}")
+        elif first > self.last_update_id + 1:
+            raise BookGapError(f"{self.symbol}: snapshot {self.last_update_id} older than update {first}")
+        for price, quantity in event['b']:
+            self.bids.set(float(price), float(quantity))
+        for price, quantity in event['a']:
+            self.asks.set(float(price), float(quantity))
+        self.last_update_id = last
+        self.synced = True
+        return True
+
+    def top(self, count=DEPTH_LEVELS):
+        return self.bids.top(count), self.asks.top(count)
+
+# Depth View (top N levels per side with cumulative quantity bars)
+class DepthView(QWidget):
+    def __init__(self, parent=None, levels=DEPTH_LEVELS):
+        super().__init__(parent)
+        self.levels = levels
+        self.bids = []
+        self.asks = []
+        self.font = QFont('Montserrat', 10, QFont.Bold)
+        self.setAttribute(Qt.WA_TranslucentBackground)
+        self.setMinimumHeight(15 * (levels + 1))
+
+    def set_levels(self, bids, asks):
+        bids, asks = bids[:self.levels], asks[:self.levels]
+        if bids == self.bids and asks == self.asks:
+            return
+        self.bids, self.asks = bids, asks
+        self.update()
+
+    def clear(self):
+        self.set_levels([], [])
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setFont(self.font)
+        width = self.width()
+        row = self.height() / (self.levels + 1)
+        half = width / 2
+
+        if self.bids and self.asks:
+            best_bid, best_ask = self.bids[0][0], self.asks[0][0]
+            spread = best_ask - best_bid
+            header = f'Spread {spread:,.2f} ({spread / best_ask * 100:.3f}%)'
+        else:
+            header = 'Waiting for order book...'
+        painter.setPen(QColor('white'))
+        painter.drawText(QRectF(0, 0, width, row), Qt.AlignCenter, header)
+
+        total = max(sum(quantity for _, quantity in self.bids), sum(quantity for _, quantity in self.asks), 1e-12)
+        for side, levels, color in ((0, self.bids, QColor(0, 200, 0, 90)), (1, self.asks, QColor(220, 0, 0, 90))):
+            cumulative = 0.0
+            for i, (price, quantity) in enumerate(levels):
+                cumulative += quantity
+                y = row * (i + 1)
+                bar = half * cumulative / total
+                x = half - bar if side == 0 else half
+                painter.fillRect(QRectF(x, y + 1, bar, row - 2), color)
+                painter.setPen(QColor('white'))
+                text_rect = QRectF(side * half + 4, y, half - 8, row)
+                painter.drawText(text_rect, Qt.AlignVCenter | (Qt.AlignRight if side == 0 else Qt.AlignLeft), f'{price:,.2f}')
+                painter.setPen(QColor(200, 200, 200))
+                painter.drawText(text_rect, Qt.AlignVCenter | (Qt.AlignLeft if side == 0 else Qt.AlignRight), f'{quantity:,.4f}')
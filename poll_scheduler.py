@@ -0,0 +1,129 @@
+import glob
+import os
+import time
+from collections import deque
+
+from binance_client import MAX_SYMBOLS
+
+# VARIABLES
+MIN_INTERVAL = 10  # Seconds, fastest poll for the displayed token
+BASE_INTERVAL = 60  # Seconds, displayed token in a calm market
+OFFSCREEN_INTERVAL = 300  # Seconds, tokens that are not on screen
+VOLATILITY_THRESHOLD = 0.1  # % per minute that halves the displayed token interval
+VOLATILITY_SMOOTHING = 0.3  # EWMA weight of the newest sample
+WEIGHT_BUDGET = int(os.environ.get('CRYPTODASH_WEIGHT_BUDGET', 40))  # Request weight per minute
+BATCH_SIZE = 19  # Tokens per request: stays in the cheapest weight tier with the cross rate symbol added
+BACKLIGHT_GLOB = '/sys/class/backlight/*/bl_power'
+
+# Binance weight of /api/v3/ticker/24hr for n symbols (sent in requests of at most MAX_SYMBOLS)
+def ticker_weight(count):
+    if count > MAX_SYMBOLS:
+        return ticker_weight(MAX_SYMBOLS) + ticker_weight(count - MAX_SYMBOLS)
+    if count <= 20:
+        return 2
+    return 40
+
+# Display power from the backlight (Pi DSI screens); True when unknown
+def display_powered():
+    states = []
+    for path in glob.glob(BACKLIGHT_GLOB):
+        try:
+            with open(path, 'r') as f:
+                states.append(f.read().strip() == '0')
+        except OSError:
+            continue
+    return any(states) if states else True
+
+# Adaptive Polling Scheduler
+class PollScheduler:
+    """Decides which tokens to poll and when, sharing one timer for every token.
+
+    The displayed token is polled faster when its price moves quickly,
+    off-screen tokens slowly, nothing while the display is off, and never
+    more than the request weight budget per minute.
+    """
+
+    def __init__(self, min_interval=MIN_INTERVAL, base_interval=BASE_INTERVAL,
+                 offscreen_interval=OFFSCREEN_INTERVAL, weight_budget=WEIGHT_BUDGET,
+                 batch_size=BATCH_SIZE):
+        self.min_interval = min_interval
+        self.base_interval = base_interval
+        self.offscreen_interval = offscreen_interval
+        self.weight_budget = weight_budget
+        self.batch_size = batch_size
+        self.active = None
+        self.paused = False
+        self.last_poll = {}
+        self.last_price = {}
+        self.volatility = {}
+        self.spent = deque()  # (timestamp, weight) of requests in the last minute
+
+    def add_token(self, token_id):
+        self.last_poll.setdefault(token_id, 0)
+
+    def set_active(self, token_id):
+        self.active = token_id
+
+    def set_paused(self, paused):
+        self.paused = paused
+
+    # Update per-token volatility (EWMA of |% change| per minute)
+    def observe(self, snapshot, now=None):
+        now = time.time() if now is None else now
+        for token_id, data in snapshot.items():
+            price = data.get('price')
+            if not price:
+                continue
+            previous = self.last_price.get(token_id)
+            if previous is not None and previous[1] and now > previous[0]:
+                change = abs(price - previous[1]) / previous[1] * 100
+                per_minute = change / max((now - previous[0]) / 60, 1 / 60)
+                current = self.volatility.get(token_id, per_minute)
+                self.volatility[token_id] = current + VOLATILITY_SMOOTHING * (per_minute - current)
+            self.last_price[token_id] = (now, price)
+
+    def interval_for(self, token_id):
+        if token_id != self.active:
+            return self.offscreen_interval
+        speedup = 1 + self.volatility.get(token_id, 0.0) / VOLATILITY_THRESHOLD
+        return max(self.min_interval, self.base_interval / speedup)
+
+    def budget_left(self, now):
+        while self.spent and now - self.spent[0][0] >= 60:
+            self.spent.popleft()
+        return self.weight_budget - sum(weight for _, weight in self.spent)
+
+    # Tokens to fetch now (one batch; the rest rotate in on the following polls)
+    def due(self, now=None):
+        now = time.time() if now is None else now
+        if self.paused:
+            return []
+        overdue = {token_id: (now - last) / self.interval_for(token_id)
+                   for token_id, last in self.last_poll.items()}
+        if not any(ratio >= 1 for ratio in overdue.values()):
+            return []
+        # Poll everything that is nearly due in the same request, displayed and most overdue first
+        tokens = sorted((token_id for token_id, ratio in overdue.items() if ratio >= 0.8),
+                        key=lambda token_id: (token_id != self.active, -overdue[token_id]))
+        tokens = tokens[:self.batch_size]
+        if ticker_weight(len(tokens)) > self.budget_left(now):
+            return []
+        return tokens
+
+    def record(self, tokens, now=None):
+        now = time.time() if now is None else now
+        for token_id in tokens:
+            self.last_poll[token_id] = now
+        if tokens:
+            self.spent.append((now, ticker_weight(len(tokens))))
+
+    # Seconds until the next token is due
+    def next_delay(self, now=None):
+        now = time.time() if now is None else now
+        if not self.last_poll:
+            return self.base_interval
+        delay = min(last + self.interval_for(token_id) - now for token_id, last in self.last_poll.items())
+        # Nothing is affordable until the oldest request leaves the window
+        if self.budget_left(now) < ticker_weight(1) and self.spent:
+            delay = max(delay, self.spent[0][0] + 60 - now)
+        return max(1.0, delay)
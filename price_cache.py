@@ -0,0 +1,71 @@
+import json
+import os
+import stat
+import tempfile
+import time
+
+# VARIABLES
+CACHE_DIR = os.environ.get('CRYPTODASH_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'cryptodash'))
+PRICE_CACHE_FILE = os.path.join(CACHE_DIR, 'last_prices.json')
+SAVE_INTERVAL = 60  # Seconds between writes while streaming
+
+# Write a file atomically (temp file in the same directory + rename)
+def atomic_write(path, text, mode=None):
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        copy_ownership(path, tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+# mkstemp files are 0600 and owned by us; a replaced file keeps its mode, owner and group, a new one gets mode
+def copy_ownership(source, target, mode=None):
+    try:
+        st = os.stat(source)
+    except FileNotFoundError:
+        if mode is not None:
+            os.chmod(target, mode)
+        return
+    os.chmod(target, stat.S_IMODE(st.st_mode))
+    try:
+        os.chown(target, st.st_uid, st.st_gid)
+    except PermissionError:
+        pass  # Only root can give files away, the mode is still kept
+
+# Last Known Prices (shown instantly on cold start)
+def save_prices(snapshot, path=PRICE_CACHE_FILE):
+    now = time.time()
+    entries = {
+        token_id: {'price': data['price'], '24h_change': data['24h_change'], 'time': data.get('time', now)}
+        for token_id, data in snapshot.items() if data.get('price')
+    }
+    if not entries:
+        return
+    try:
+        atomic_write(path, json.dumps(entries, separators=(',', ':')))
+    except OSError as e:
+        print(f"Error saving price cache: {e}")
+
+def load_prices(path=PRICE_CACHE_FILE):
+    try:
+        with open(path, 'r') as f:
+            entries = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return {
+        token_id: {
+            'price': entry['price'],
+            '24h_change': entry['24h_change'],
+            'symbol': token_id.upper(),
+            'time': entry['time'],
+            'stale': True
+        }
+        for token_id, entry in entries.items()
+    }
@@ -0,0 +1,162 @@
+import argparse
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+from binance_client import get_tokens_data
+
+# Local price aggregator: fetches once for every dashboard process on the host
+# and publishes snapshots over a Unix domain socket (newline-delimited JSON).
+#   client -> daemon: {"subscribe": ["btc", "eth"]}
+#   daemon -> client: {"time": 1716198593.6, "snapshot": {"btc": {...}}}
+
+# VARIABLES
+SOCKET_PATH = os.environ.get('CRYPTODASH_DAEMON_SOCKET', '/tmp/cryptodash.sock')
+FETCH_INTERVAL = 30
+
+def encode(message):
+    return (json.dumps(message, separators=(',', ':')) + '\n').encode('utf-8')
+
+# One connected dashboard
+class DaemonHandler(socketserver.StreamRequestHandler):
+    def setup(self):
+        super().setup()
+        self.tokens = set()
+        self.send_lock = threading.Lock()
+
+    def handle(self):
+        daemon = self.server.daemon
+        daemon.add_client(self)
+        try:
+            for line in self.rfile:
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    continue
+                tokens = message.get('subscribe')
+                if tokens:
+                    daemon.subscribe(self, tokens)
+        except OSError:
+            pass
+        finally:
+            daemon.remove_client(self)
+
+    def send(self, message):
+        try:
+            with self.send_lock:
+                self.wfile.write(encode(message))
+                self.wfile.flush()
+        except OSError:
+            pass  # Client went away, handle() cleans up
+
+class UnixServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+# Price Aggregator Daemon
+class PriceDaemon:
+    def __init__(self, socket_path=SOCKET_PATH, interval=FETCH_INTERVAL):
+        self.socket_path = socket_path
+        self.interval = interval
+        self.clients = set()
+        self.snapshot = {}
+        self.snapshot_time = 0
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.running = False
+        self.server = None
+
+    def add_client(self, client):
+        with self.lock:
+            self.clients.add(client)
+
+    def remove_client(self, client):
+        with self.lock:
+            self.clients.discard(client)
+
+    def subscribe(self, client, tokens):
+        with self.lock:
+            new_tokens = set(tokens) - self.subscribed()
+            client.tokens = set(tokens)
+            cached = {token_id: self.snapshot[token_id] for token_id in client.tokens if token_id in self.snapshot}
+        if cached:
+            client.send({'time': self.snapshot_time, 'snapshot': cached})
+        if new_tokens:
+            self.wake.set()
+
+    def subscribed(self):
+        tokens = set()
+        for client in self.clients:
+            tokens |= client.tokens
+        return tokens
+
+    # Fetch loop: one batched request for the union of all subscriptions
+    def fetch_loop(self):
+        while self.running:
+            with self.lock:
+                tokens = sorted(self.subscribed())
+            if tokens:
+                snapshot = get_tokens_data(tokens)
+                if snapshot:
+                    self.publish(snapshot)
+            self.wake.wait(self.interval)
+            self.wake.clear()
+
+    def publish(self, snapshot):
+        with self.lock:
+            self.snapshot.update(snapshot)
+            self.snapshot_time = time.time()
+            clients = list(self.clients)
+        for client in clients:
+            subset = {token_id: data for token_id, data in snapshot.items() if token_id in client.tokens}
+            if subset:
+                client.send({'time': self.snapshot_time, 'snapshot': subset})
+
+    def remove_stale_socket(self):
+        if not os.path.exists(self.socket_path):
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.socket_path)
+        except OSError:
+            os.unlink(self.socket_path)  # Left behind by a daemon that died
+            return
+        finally:
+            probe.close()
+        raise RuntimeError(f"Price daemon already running on {self.socket_path}")
+
+    def serve_forever(self):
+        self.remove_stale_socket()
+        self.server = UnixServer(self.socket_path, DaemonHandler)
+        self.server.daemon = self
+        os.chmod(self.socket_path, 0o666)
+        self.running = True
+        threading.Thread(target=self.fetch_loop, daemon=True).start()
+        print(f"Price daemon listening on {self.socket_path}")
+        try:
+            self.server.serve_forever()
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        self.running = False
+        self.wake.set()
+        if self.server is not None:
+            self.server.server_close()
+            self.server = None
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+# Main
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Crypto Dashboard price daemon')
+    parser.add_argument('--socket', default=SOCKET_PATH, help='Unix socket path')
+    parser.add_argument('--interval', type=float, default=FETCH_INTERVAL, help='Seconds between fetches')
+    args = parser.parse_args()
+
+    daemon = PriceDaemon(args.socket, args.interval)
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,145 @@
+from array import array
+from collections import deque
+from PyQt5.QtWidgets import QWidget
+from PyQt5.QtGui import QPainter, QPen, QColor, QPolygonF, QFont
+from PyQt5.QtCore import Qt, QPointF
+
+# VARIABLES
+HISTORY_SIZE = 240  # Samples per symbol
+SAMPLE_INTERVAL = 60  # Seconds per sample (matches 1m klines)
+
+# Fixed-size Price Ring Buffer
+class PriceHistory:
+    """Ring buffer of prices in a compact array('d') with O(1) amortized min/max/mean.
+
+    Completed samples live in the ring; ticks arriving inside the current
+    sample interval only update the open (newest) sample.
+    """
+
+    def __init__(self, capacity=HISTORY_SIZE, sample_interval=SAMPLE_INTERVAL):
+        self.capacity = capacity
+        self.sample_interval = sample_interval
+        self.prices = array('d', bytes(8 * capacity))
+        self.times = array('d', bytes(8 * capacity))
+        self.count = 0
+        self.seq = 0  # Total samples ever committed
+        self.total = 0.0
+        # Monotonic queues of (seq, price) for the sliding window min / max
+        self.min_queue = deque()
+        self.max_queue = deque()
+        # Open sample (timestamp, price)
+        self.open_time = None
+        self.open_price = 0.0
+
+    def __len__(self):
+        return self.count + (self.open_time is not None)
+
+    @property
+    def min(self):
+        if self.open_time is None:
+            return self.min_queue[0][1] if self.min_queue else 0.0
+        return min(self.min_queue[0][1], self.open_price) if self.min_queue else self.open_price
+
+    @property
+    def max(self):
+        if self.open_time is None:
+            return self.max_queue[0][1] if self.max_queue else 0.0
+        return max(self.max_queue[0][1], self.open_price) if self.max_queue else self.open_price
+
+    @property
+    def mean(self):
+        count = len(self)
+        if not count:
+            return 0.0
+        return (self.total + (self.open_price if self.open_time is not None else 0.0)) / count
+
+    @property
+    def last(self):
+        return self.open_price
+
+    def push(self, timestamp, price):
+        if self.open_time is not None and timestamp - self.open_time >= self.sample_interval:
+            self.commit(self.open_time, self.open_price)
+            self.open_time = None
+        if self.open_time is None:
+            self.open_time = timestamp
+        self.open_price = price
+
+    def commit(self, timestamp, price):
+        # Keep one slot free for the open sample
+        window = self.capacity - 1
+        index = self.seq % self.capacity
+        if self.count == window:
+            oldest = self.seq - window
+            self.total -= self.prices[oldest % self.capacity]
+            if self.min_queue[0][0] == oldest:
+                self.min_queue.popleft()
+            if self.max_queue[0][0] == oldest:
+                self.max_queue.popleft()
+        else:
+            self.count += 1
+
+        self.prices[index] = price
+        self.times[index] = timestamp
+        self.total += price
+        while self.min_queue and self.min_queue[-1][1] >= price:
+            self.min_queue.pop()
+        self.min_queue.append((self.seq, price))
+        while self.max_queue and self.max_queue[-1][1] <= price:
+            self.max_queue.pop()
+        self.max_queue.append((self.seq, price))
+        self.seq += 1
+
+    def extend(self, samples):
+        for timestamp, price in samples:
+            self.push(timestamp, price)
+
+    # Prices oldest to newest (including the open sample)
+    def values(self):
+        start = (self.seq - self.count) % self.capacity
+        if start + self.count <= self.capacity:
+            values = self.prices[start:start + self.count]
+        else:
+            values = self.prices[start:] + self.prices[:(start + self.count) % self.capacity]
+        if self.open_time is not None:
+            values.append(self.open_price)
+        return values
+
+# Sparkline Mini Chart
+class Sparkline(QWidget):
+    def __init__(self, parent=None, height=40):
+        super().__init__(parent)
+        self.history = None
+        self.label = ''  # Timeframe shown in the corner
+        self.setFixedHeight(height)
+        self.setAttribute(Qt.WA_TranslucentBackground)
+        self.setStyleSheet("background-color: transparent;")
+
+    def set_history(self, history):
+        self.history = history
+        self.update()
+
+    def paintEvent(self, event):
+        history = self.history
+        painter = QPainter(self)
+        if self.label:
+            painter.setFont(QFont('Montserrat', 8))
+            painter.setPen(QColor(255, 255, 255, 160))
+            painter.drawText(self.rect().adjusted(2, 0, 0, 0), Qt.AlignLeft | Qt.AlignTop, self.label)
+        if history is None or len(history) < 2:
+            return
+        values = history.values()
+        low, high = history.min, history.max
+        span = (high - low) or 1.0
+        width = self.width() - 2
+        height = self.height() - 2
+        step = width / (len(values) - 1)
+        polygon = QPolygonF([
+            QPointF(1 + i * step, 1 + height - (value - low) / span * height)
+            for i, value in enumerate(values)
+        ])
+
+        painter.setRenderHint(QPainter.Antialiasing)
+        color = QColor("#00FF00") if values[-1] >= values[0] else QColor("red")
+        painter.setPen(QPen(color, 2))
+        painter.drawPolyline(polygon)
@@ -0,0 +1,106 @@
+import json
+import os
+import random
+import time
+from PyQt5.QtCore import QThread, pyqtSignal
+from binance_client import pair_symbol
+
+websocket = None  # websocket-client module, loaded on demand
+
+# VARIABLES
+STREAM_URL = os.environ.get('CRYPTODASH_STREAM_URL', 'wss://stream.binance.com:9443')
+STREAM_TYPE = 'ticker'  # 'ticker' or 'miniTicker'
+RECV_TIMEOUT = 30
+RECONNECT_MIN = 1
+RECONNECT_MAX = 60
+
+def stream_url(token_ids, base_url=STREAM_URL, stream_type=STREAM_TYPE):
+    streams = '/'.join(f'{pair_symbol(token_id).lower()}@{stream_type}' for token_id in token_ids)
+    return f'{base_url}/stream?streams={streams}'
+
+# Convert a @ticker / @miniTicker event into the dashboard ticker format
+def parse_stream_ticker(event, token_id):
+    price = float(event['c'])
+    if 'P' in event:
+        day_change = float(event['P'])
+    else:
+        open_price = float(event['o'])
+        day_change = (price - open_price) / open_price * 100 if open_price else 0.0
+    return {
+        'price': price,
+        '24h_change': day_change,
+        'symbol': token_id.upper()
+    }
+
+# Multiplexed WebSocket Ticker Stream
+class PriceStream(QThread):
+    ticker_received = pyqtSignal(str, dict)
+    connected = pyqtSignal()
+    disconnected = pyqtSignal()
+
+    def __init__(self, token_ids, base_url=STREAM_URL, stream_type=STREAM_TYPE, parent=None):
+        super().__init__(parent)
+        self.pairs = {pair_symbol(token_id): token_id for token_id in token_ids}
+        self.url = stream_url(token_ids, base_url, stream_type)
+        self.running = False
+        self.ws = None
+
+    # websocket-client is optional and imported only when streaming is enabled
+    @staticmethod
+    def available():
+        global websocket
+        if websocket is None:
+            try:
+                import websocket as websocket_client
+            except ImportError:  # The dashboard falls back to REST polling
+                return False
+            websocket = websocket_client
+        return True
+
+    def run(self):
+        self.running = True
+        delay = RECONNECT_MIN
+        while self.running:
+            try:
+                self.ws = websocket.create_connection(self.url, timeout=RECV_TIMEOUT)
+                self.connected.emit()
+                delay = RECONNECT_MIN
+                while self.running:
+                    self.handle_message(self.ws.recv())
+            except Exception as e:
+                if self.running:
+                    print(f"Price stream error: {e}")
+            finally:
+                if self.ws is not None:
+                    self.ws.close()
+                    self.ws = None
+            if not self.running:
+                break
+            self.disconnected.emit()
+            # Reconnect with jittered exponential backoff
+            self.sleep_interruptible(random.uniform(delay / 2, delay))
+            delay = min(RECONNECT_MAX, delay * 2)
+
+    def handle_message(self, message):
+        if not message:
+            raise ConnectionError("Stream closed by server")
+        payload = json.loads(message)
+        event = payload.get('data', payload)
+        token_id = self.pairs.get(event.get('s'))
+        if token_id is not None:
+            self.ticker_received.emit(token_id, parse_stream_ticker(event, token_id))
+
+    def sleep_interruptible(self, seconds):
+        end = time.time() + seconds
+        while self.running and time.time() < end:
+            self.msleep(100)
+
+    def stop(self):
+        self.running = False
+        ws = self.ws
+        if ws is not None:
+            try:
+                ws.shutdown()
+            except Exception:
+                pass
+        self.wait()
@@ -0,0 +1,87 @@
+from collections import OrderedDict
+from PyQt5.QtWidgets import QLabel, QGraphicsScene, QGraphicsPixmapItem, QGraphicsDropShadowEffect
+from PyQt5.QtGui import QImage, QPixmap, QPainter, QColor, QTextDocument
+from PyQt5.QtCore import Qt, QRectF
+
+# VARIABLES
+TEXT_CACHE_SIZE = 8  # Rendered texts kept per label
+
+# Render a pixmap with its drop shadow once, instead of a live QGraphicsEffect
+def render_shadow(pixmap, color, blur_radius):
+    pad = int(blur_radius)
+    scene = QGraphicsScene()
+    item = QGraphicsPixmapItem(pixmap)
+    effect = QGraphicsDropShadowEffect()
+    effect.setBlurRadius(blur_radius)
+    effect.setColor(QColor(color))
+    effect.setOffset(0, 0)
+    item.setGraphicsEffect(effect)
+    scene.addItem(item)
+
+    image = QImage(pixmap.width() + 2 * pad, pixmap.height() + 2 * pad, QImage.Format_ARGB32_Premultiplied)
+    image.fill(Qt.transparent)
+    painter = QPainter(image)
+    scene.render(painter, QRectF(image.rect()), QRectF(-pad, -pad, image.width(), image.height()))
+    painter.end()
+    return QPixmap.fromImage(image)
+
+# Label drawing pre-rendered shadowed text
+class ShadowLabel(QLabel):
+    """QLabel replacement that renders text + shadow into a cached pixmap.
+
+    setText is dirty-checked, so unchanged text costs nothing and repaints
+    only blit the cached pixmap.
+    """
+    cache_size = TEXT_CACHE_SIZE
+
+    def __init__(self, text, parent=None, font=None, color='white', shadow_color='gray', blur_radius=10):
+        super().__init__(parent)
+        self.text_color = color
+        self.shadow_color = shadow_color
+        self.blur_radius = blur_radius
+        self.current_text = None
+        self.cache = OrderedDict()
+        self.setStyleSheet("background-color: transparent;")
+        if font is not None:
+            self.setFont(font)
+        self.setText(text)
+
+    def text(self):
+        return self.current_text
+
+    def setText(self, text):
+        if text == self.current_text:
+            return
+        self.current_text = text
+        pixmap = self.cache.get(text)
+        if pixmap is None:
+            pixmap = self.render_text(text)
+            self.cache[text] = pixmap
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        else:
+            self.cache.move_to_end(text)
+        self.setPixmap(pixmap)
+
+    def set_shadow(self, color, blur_radius):
+        self.shadow_color = color
+        self.blur_radius = blur_radius
+        self.cache.clear()
+        text, self.current_text = self.current_text, None
+        self.setText(text)
+
+    def render_text(self, text):
+        document = QTextDocument()
+        document.setDocumentMargin(0)
+        document.setDefaultFont(self.font())
+        document.setDefaultStyleSheet(f"body {{ color: {self.text_color}; }}")
+        document.setHtml(f"<body>{text}</body>")
+        size = document.size()
+
+        image = QImage(int(size.width()) + 1, int(size.height()) + 1, QImage.Format_ARGB32_Premultiplied)
+        image.fill(Qt.transparent)
+        painter = QPainter(image)
+        painter.setRenderHint(QPainter.TextAntialiasing)
+        document.drawContents(painter, QRectF(image.rect()))
+        painter.end()
+        return render_shadow(QPixmap.fromImage(image), self.shadow_color, self.blur_radius)
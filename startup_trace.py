@@ -0,0 +1,44 @@
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+# Enabled with CRYPTODASH_TRACE_STARTUP=1 (crypto_dash.py --trace-startup sets tracer.enabled);
+# phases are always recorded, only the report is skipped when disabled
+TRACE_ENABLED = os.environ.get('CRYPTODASH_TRACE_STARTUP') == '1'
+
+# Startup Phase Tracer
+class StartupTracer:
+    def __init__(self, enabled=TRACE_ENABLED):
+        self.enabled = enabled
+        self.start = time.perf_counter()
+        self.last = self.start
+        self.phases = []
+
+    @contextmanager
+    def phase(self, name):
+        begin = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.phases.append((name, begin - self.start, end - begin))
+            self.last = end
+
+    # Record the time spent since the previous phase / mark
+    def mark(self, name):
+        now = time.perf_counter()
+        self.phases.append((name, self.last - self.start, now - self.last))
+        self.last = now
+
+    def report(self, file=sys.stderr):
+        if not self.enabled:
+            return
+        print("Startup trace (ms):", file=file)
+        print(f"  {'phase':<28}{'start':>10}{'took':>10}", file=file)
+        for name, offset, duration in self.phases:
+            print(f"  {name:<28}{offset * 1000:>10.1f}{duration * 1000:>10.1f}", file=file)
+        total = time.perf_counter() - self.start
+        print(f"  {'total':<28}{'':>10}{total * 1000:>10.1f}", file=file)
+
+tracer = StartupTracer()
@@ -0,0 +1,9 @@
+import os
+import sys
+import tempfile
+
+# Modules live at the repository root; caches never touch the real ~/.cache
+BASE_PATH = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, BASE_PATH)
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+os.environ['CRYPTODASH_CACHE_DIR'] = tempfile.mkdtemp(prefix='cryptodash-tests-')
@@ -0,0 +1,52 @@
+import random
+
+from alerts import Alert, AlertEngine, LevelIndex
+
+def test_level_index_bounds():
+    index = LevelIndex()
+    alerts = {value: Alert('btc', 'above', value) for value in (10, 20, 20, 30)}
+    for alert in alerts.values():
+        index.add(alert)
+    # Rising: (low, high], falling: [low, high)
+    assert [a.value for a in index.crossed_up(10, 20)] == [20]
+    assert [a.value for a in index.crossed_up(9.99, 30)] == [10, 20, 30]
+    assert index.crossed_up(30, 40) == []
+    assert [a.value for a in index.crossed_down(10, 20)] == [10]
+    assert [a.value for a in index.crossed_down(20, 30.01)] == [20, 30]
+    assert index.crossed_down(0, 10) == []
+
+def test_first_tick_and_debounce():
+    alert = Alert('eth', 'above', 10)
+    engine = AlertEngine([alert], debounce=300)
+    assert engine.update('eth', 11, 0) == []  # No previous price, nothing crossed
+    assert engine.update('eth', 9, 1) == []
+    assert [a for a, _ in engine.update('eth', 11, 2)] == [alert]
+    engine.update('eth', 9, 3)
+    assert engine.update('eth', 11, 4) == []  # Debounced
+    engine.update('eth', 9, 400)
+    assert [a for a, _ in engine.update('eth', 11, 401)] == [alert]
+
+# Brute force: every alert checked against every tick
+def test_matches_brute_force():
+    rng = random.Random(3)
+    alerts = [Alert('btc', rng.choice(['above', 'below']), rng.uniform(90, 110)) for _ in range(5000)]
+    alerts += [Alert('btc', 'move', rng.uniform(0.5, 5), window=600) for _ in range(200)]
+    engine = AlertEngine(alerts, debounce=0)
+    price = 100.0
+    engine.update('btc', price, 0)
+    history = [(0, price)]
+    for now in range(1, 3001):
+        new_price = price * (1 + rng.gauss(0, 0.003))
+        fired = engine.update('btc', new_price, now)
+
+        expected = {id(a) for a in alerts if a.kind == 'above' and price < a.value <= new_price}
+        expected |= {id(a) for a in alerts if a.kind == 'below' and new_price <= a.value < price}
+        history.append((now, new_price))
+        window = [p for t, p in history if t >= now - 600]
+        low, high = min(window), max(window)
+        rise, fall = (new_price - low) / low * 100, (new_price - high) / high * 100
+        move = rise if rise >= -fall else fall
+        expected |= {id(a) for a in alerts if a.kind == 'move' and a.value <= abs(move)}
+
+        assert {id(a) for a, _ in fired} == expected, f"tick {now}"
+        price = new_price
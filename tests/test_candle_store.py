@@ -0,0 +1,54 @@
+import random
+
+import pytest
+
+from candle_store import CandleStore, INTERVAL_SECONDS, batches
+
+STEP = INTERVAL_SECONDS['1h'] * 1000
+
+@pytest.fixture
+def store(tmp_path):
+    store = CandleStore(str(tmp_path / 'candles.sqlite'))
+    yield store
+    store.close()
+
+def candles(start, end):
+    return [(t, 1.0, 1.0, 1.0, 1.0, 1.0) for t in range(start, end + 1, STEP)]
+
+def fill(store, start, end):
+    store.insert('BTCUSDT', '1h', candles(start, end), start, end)
+
+def test_empty_store_misses_everything(store):
+    assert store.missing('BTCUSDT', '1h', 0, 10 * STEP) == [(0, 10 * STEP)]
+
+def test_touching_ranges_merge(store):
+    fill(store, 0, 3 * STEP)
+    fill(store, 4 * STEP, 6 * STEP)  # Next candle: touching
+    assert store.ranges('BTCUSDT', '1h', 0, 10 * STEP) == [(0, 6 * STEP)]
+    fill(store, 8 * STEP, 9 * STEP)  # One candle apart: separate
+    assert store.ranges('BTCUSDT', '1h', 0, 10 * STEP) == [(0, 6 * STEP), (8 * STEP, 9 * STEP)]
+    assert store.missing('BTCUSDT', '1h', 0, 10 * STEP) == [(7 * STEP, 7 * STEP), (10 * STEP, 10 * STEP)]
+    fill(store, 7 * STEP, 7 * STEP)
+    assert store.ranges('BTCUSDT', '1h', 0, 10 * STEP) == [(0, 9 * STEP)]
+
+def test_batches_respect_limit():
+    assert list(batches([(0, 4 * STEP)], STEP, limit=2)) == [(0, STEP), (2 * STEP, 3 * STEP), (4 * STEP, 4 * STEP)]
+
+# Brute force: a set of covered open times
+def test_matches_brute_force(store):
+    rng = random.Random(7)
+    covered = set()
+    for _ in range(300):
+        start = rng.randint(0, 200) * STEP
+        end = start + rng.randint(0, 15) * STEP
+        fill(store, start, end)
+        covered.update(range(start, end + 1, STEP))
+
+        ranges = store.ranges('BTCUSDT', '1h', 0, 250 * STEP)
+        for (_, previous_end), (next_start, _) in zip(ranges, ranges[1:]):
+            assert next_start > previous_end + STEP  # Merged: no overlapping or touching ranges
+        query_start = rng.randint(0, 220) * STEP
+        query_end = query_start + rng.randint(0, 40) * STEP
+        gaps = store.missing('BTCUSDT', '1h', query_start, query_end)
+        missing = {t for start, end in gaps for t in range(start, end + 1, STEP)}
+        assert missing == set(range(query_start, query_end + 1, STEP)) - covered
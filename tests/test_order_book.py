@@ -0,0 +1,62 @@
+import random
+
+import pytest
+
+from order_book import BookGapError, OrderBook
+
+def event(first, last, bids=(), asks=()):
+    return {'U': first, 'u': last, 'b': list(bids), 'a': list(asks)}
+
+@pytest.fixture
+def book():
+    book = OrderBook('BTCUSDT')
+    book.apply_snapshot({'lastUpdateId': 100, 'bids': [['99', '1']], 'asks': [['101', '1']]})
+    return book
+
+def test_no_snapshot():
+    with pytest.raises(BookGapError):
+        OrderBook('BTCUSDT').apply_diff(event(1, 2))
+
+def test_events_in_snapshot_are_dropped(book):
+    assert book.apply_diff(event(90, 100, bids=[['98', '5']])) is False
+    assert book.top() == ([(99.0, 1.0)], [(101.0, 1.0)])
+
+def test_first_event_must_bridge_snapshot(book):
+    with pytest.raises(BookGapError):
+        book.apply_diff(event(102, 105))
+
+def test_bridging_then_sequential(book):
+    assert book.apply_diff(event(95, 103, bids=[['99', '0'], ['98', '2']]))
+    assert book.last_update_id == 103
+    assert book.apply_diff(event(104, 104, asks=[['100.5', '3']]))
+    assert book.top() == ([(98.0, 2.0)], [(100.5, 3.0), (101.0, 1.0)])
+    with pytest.raises(BookGapError):
+        book.apply_diff(event(106, 107))
+    with pytest.raises(BookGapError):
+        book.apply_diff(event(104, 106))  # Once synced, U must follow u exactly
+
+def test_levels_are_capped():
+    book = OrderBook('BTCUSDT', max_levels=5)
+    book.apply_snapshot({'lastUpdateId': 1, 'bids': [[str(p), '1'] for p in range(10)], 'asks': []})
+    assert [price for price, _ in book.bids.top(10)] == [9.0, 8.0, 7.0, 6.0, 5.0]
+
+# Brute force: plain dicts sorted on every check
+def test_matches_brute_force():
+    rng = random.Random(5)
+    book = OrderBook('X')
+    book.apply_snapshot({'lastUpdateId': 10, 'bids': [['100', '1']], 'asks': [['101', '1']]})
+    bids, asks = {100.0: 1.0}, {101.0: 1.0}
+    update_id = 10
+    for _ in range(5000):
+        changes_b = [[f'{rng.randint(50, 100)}', f'{rng.choice([0, rng.random()])}'] for _ in range(3)]
+        changes_a = [[f'{rng.randint(101, 150)}', f'{rng.choice([0, rng.random()])}'] for _ in range(3)]
+        book.apply_diff(event(update_id + 1, update_id + 2, changes_b, changes_a))
+        update_id += 2
+        for changes, levels in ((changes_b, bids), (changes_a, asks)):
+            for price, quantity in changes:
+                if float(quantity) == 0:
+                    levels.pop(float(price), None)
+                else:
+                    levels[float(price)] = float(quantity)
+        assert book.top(10) == (sorted(bids.items(), reverse=True)[:10], sorted(asks.items())[:10])
+    assert (len(book.bids), len(book.asks)) == (len(bids), len(asks))
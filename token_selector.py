@@ -0,0 +1,125 @@
+import json
+import os
+from PyQt5.QtWidgets import QListView, QStyledItemDelegate, QAbstractItemView, QScroller
+from PyQt5.QtGui import QColor, QFont
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, QSize, QRect, pyqtSignal
+from image_cache import image_cache
+
+# VARIABLES
+BASE_PATH = os.path.dirname(os.path.realpath(__file__))
+THUMB_PATH = os.path.join(BASE_PATH, "images", "thumbs")
+TOKENS_FILE = os.environ.get('CRYPTODASH_TOKENS', os.path.join(BASE_PATH, "tokens.json"))
+DEFAULT_TOKENS = [
+    ('Bitcoin', 'btc'),
+    ('Ethereum', 'eth'),
+    ('Cardano', 'ada'),
+    ('Binance', 'bnb'),
+    ('Solana', 'sol'),
+]
+TokenIdRole = Qt.UserRole + 1
+
+# Token List Config
+def load_tokens(path=TOKENS_FILE):
+    """Returns [(name, id), ...] from the tokens config file, or the default tokens."""
+    try:
+        with open(path, 'r') as f:
+            config = json.load(f)
+        tokens = [(token['name'], token['id'].lower()) for token in config['tokens']]
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        print(f"Using default tokens ({e})")
+        return list(DEFAULT_TOKENS)
+    return tokens or list(DEFAULT_TOKENS)
+
+# Token List Model (icons are loaded only when a row is painted)
+class TokenListModel(QAbstractListModel):
+    def __init__(self, tokens, icon_size, parent=None):
+        super().__init__(parent)
+        self.tokens = list(tokens)
+        self.icon_size = icon_size
+        self.thumb_paths = {}  # token_id -> thumbnail path or None, looked up once per row
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.tokens)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        name, token_id = self.tokens[index.row()]
+        if role == Qt.DisplayRole:
+            return token_id.upper()
+        if role == Qt.ToolTipRole:
+            return name
+        if role == TokenIdRole:
+            return token_id
+        if role == Qt.DecorationRole:
+            path = self.thumb_path(token_id)
+            if path is None:
+                return None
+            return image_cache.pixmap(path, self.icon_size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        return None
+
+    def thumb_path(self, token_id):
+        if token_id not in self.thumb_paths:
+            path = os.path.join(THUMB_PATH, f"{token_id}.png")
+            self.thumb_paths[token_id] = path if os.path.exists(path) else None
+        return self.thumb_paths[token_id]
+
+# Paints one token (icon, or its symbol when there is no thumbnail)
+class TokenDelegate(QStyledItemDelegate):
+    def __init__(self, grid_size, parent=None):
+        super().__init__(parent)
+        self.grid_size = grid_size
+        self.font = QFont('Montserrat', 14, QFont.Bold)
+
+    def sizeHint(self, option, index):
+        return self.grid_size
+
+    def paint(self, painter, option, index):
+        pixmap = index.data(Qt.DecorationRole)
+        rect = option.rect
+        if pixmap is not None and not pixmap.isNull():
+            x = rect.x() + (rect.width() - pixmap.width()) // 2
+            y = rect.y() + (rect.height() - pixmap.height()) // 2
+            painter.drawPixmap(x, y, pixmap)
+            return
+        painter.save()
+        painter.setFont(self.font)
+        painter.setPen(QColor('white'))
+        painter.drawText(QRect(rect), Qt.AlignCenter, index.data(Qt.DisplayRole))
+        painter.restore()
+
+# Scrollable Token Selector (only visible rows are ever painted)
+class TokenSelector(QListView):
+    token_selected = pyqtSignal(str, str)
+
+    def __init__(self, tokens, button_size, icon_size, visible_count=5, parent=None):
+        super().__init__(parent)
+        self.token_model = TokenListModel(tokens, icon_size, self)
+        grid_size = QSize(int(button_size * 1.5), button_size)
+        self.setModel(self.token_model)
+        self.setItemDelegate(TokenDelegate(grid_size, self))
+
+        self.setFlow(QListView.LeftToRight)
+        self.setWrapping(False)
+        self.setUniformItemSizes(True)
+        self.setLayoutMode(QListView.Batched)
+        self.setBatchSize(20)
+        self.setGridSize(grid_size)
+        self.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setHorizontalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.setFocusPolicy(Qt.NoFocus)
+        self.setFrameShape(QListView.NoFrame)
+        self.setStyleSheet("background-color: transparent; border: none;")
+        self.viewport().setAutoFillBackground(False)
+        self.setFixedSize(grid_size.width() * visible_count, button_size)
+
+        # Kinetic touch scrolling
+        QScroller.grabGesture(self.viewport(), QScroller.LeftMouseButtonGesture)
+        self.clicked.connect(self.on_clicked)
+
+    def on_clicked(self, index):
+        name, token_id = self.token_model.tokens[index.row()]
+        self.token_selected.emit(name, token_id)
@@ -0,0 +1,190 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+from price_cache import atomic_write
+
+# VARIABLES
+BASE_PATH = os.path.dirname(os.path.realpath(__file__))
+WIFI_INTERFACE_INDEX = 1
+WPA_SUPPLICANT_CONF = "/etc/wpa_supplicant/wpa_supplicant.conf"
+WIFI_DEVICE = "wlan0"
+RECONFIGURE_TIMEOUT = 10
+HELPER_SCRIPT = os.path.join(BASE_PATH, "wifi_helper.py")
+
+class WiFiError(Exception):
+    pass
+
+def dedupe_networks(results):
+    """Returns [{ssid, signal}, ...] with one entry per SSID (strongest signal), strongest first."""
+    strongest = {}
+    for network in results:
+        ssid = network['ssid']
+        if ssid and (ssid not in strongest or network['signal'] > strongest[ssid]):
+            strongest[ssid] = network['signal']
+    return [{'ssid': ssid, 'signal': signal} for ssid, signal in sorted(strongest.items(), key=lambda item: -item[1])]
+
+def wpa_config(ssid, password):
+    config_lines = [
+        'ctrl_interface=DIR=/var/run/wpa_supplicant GROUP=netdev',
+        'update_config=1',
+        'country=ES',
+        '',
+        'network={',
+        '\tssid="{}"'.format(ssid),
+        '\tpsk="{}"'.format(password),
+        '}',
+        ]
+    return '\n'.join(config_lines) + '\n'
+
+def privileged(command):
+    return command if os.geteuid() == 0 else ["sudo", "-n"] + command
+
+def configure_wifi(ssid, password, path=WPA_SUPPLICANT_CONF):
+    """Writes the network to wpa_supplicant.conf and reconfigures, only if it changed.
+
+    Returns True when the file was rewritten.
+    """
+    config = wpa_config(ssid, password)
+    try:
+        with open(path, "r") as f:
+            if f.read() == config:
+                return False
+    except OSError:
+        pass  # Missing or unreadable, write it
+
+    # Temp file + rename, so wpa_supplicant never sees a half written file
+    try:
+        atomic_write(path, config)
+    except OSError as e:
+        raise WiFiError(f"Cannot write {path}: {e}") from e
+
+    print("Wifi config changed. Refreshing configs")
+    try:
+        result = subprocess.run(privileged(["wpa_cli", "-i", WIFI_DEVICE, "reconfigure"]),
+                                capture_output=True, text=True, timeout=RECONFIGURE_TIMEOUT)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        raise WiFiError(f"wpa_cli reconfigure failed: {e}") from e
+    if result.returncode != 0:
+        raise WiFiError(f"wpa_cli reconfigure failed: {result.stderr.strip() or result.stdout.strip()}")
+    return True
+
+# Direct pywifi access (needs root on the Pi)
+class LocalWiFi:
+    def __init__(self, interface_index=WIFI_INTERFACE_INDEX):
+        self.interface_index = interface_index
+        self.iface = None
+
+    def interface(self):
+        if self.iface is None:
+            try:
+                from pywifi import PyWiFi
+                self.iface = PyWiFi().interfaces()[self.interface_index]
+            except Exception as e:
+                raise WiFiError(f"No WiFi interface: {e}") from e
+        return self.iface
+
+    # Scanning is asynchronous: trigger it, then poll the results
+    def start_scan(self):
+        self.interface().scan()
+        return True
+
+    def scan_results(self):
+        return [{'ssid': network.ssid, 'signal': network.signal} for network in self.interface().scan_results()]
+
+    def connect(self, ssid, password):
+        from pywifi import const, Profile
+        iface = self.interface()
+        profile = Profile()
+        profile.ssid = ssid
+        profile.auth = const.AUTH_ALG_OPEN
+        profile.akm.append(const.AKM_TYPE_WPA2PSK)
+        profile.cipher = const.CIPHER_TYPE_CCMP
+        profile.key = password
+        iface.remove_all_network_profiles()
+        tmp_profile = iface.add_network_profile(profile)
+        iface.connect(tmp_profile)
+        return True
+
+    def status(self):
+        from pywifi import const
+        return self.interface().status() == const.IFACE_CONNECTED
+
+    def configure(self, ssid, password):
+        return configure_wifi(ssid, password)
+
+    def close(self):
+        pass
+
+# Client for the persistent privileged helper (wifi_helper.py)
+class HelperWiFi:
+    """Same interface as LocalWiFi, forwarded as JSON lines to a helper process.
+
+    The helper is started once (through sudo on the Pi) and kept running, so
+    the GUI process itself never needs root.
+    """
+
+    def __init__(self, use_sudo=False):
+        self.use_sudo = use_sudo
+        self.process = None
+        self.lock = threading.Lock()
+        self.next_id = 0
+
+    def start(self):
+        with self.lock:
+            self.ensure_started()
+
+    def ensure_started(self):
+        if self.process is not None and self.process.poll() is None:
+            return
+        command = ["sudo", "-n", "python3", HELPER_SCRIPT] if self.use_sudo else [sys.executable, HELPER_SCRIPT]
+        try:
+            self.process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                            text=True, bufsize=1)
+        except OSError as e:
+            self.process = None
+            raise WiFiError(f"Cannot start WiFi helper: {e}") from e
+
+    def call(self, op, **params):
+        with self.lock:
+            self.ensure_started()
+            self.next_id += 1
+            request = {'id': self.next_id, 'op': op, 'params': params}
+            try:
+                self.process.stdin.write(json.dumps(request) + '\n')
+                self.process.stdin.flush()
+                line = self.process.stdout.readline()
+            except OSError as e:
+                raise WiFiError(f"WiFi helper failed: {e}") from e
+            if not line:
+                raise WiFiError("WiFi helper exited")
+            response = json.loads(line)
+            if 'error' in response:
+                raise WiFiError(response['error'])
+            return response.get('result')
+
+    def start_scan(self):
+        return self.call('start_scan')
+
+    def scan_results(self):
+        return self.call('scan_results')
+
+    def connect(self, ssid, password):
+        return self.call('connect', ssid=ssid, password=password)
+
+    def status(self):
+        return self.call('status')
+
+    def configure(self, ssid, password):
+        return self.call('configure', ssid=ssid, password=password)
+
+    def close(self):
+        with self.lock:
+            if self.process is not None and self.process.poll() is None:
+                self.process.stdin.close()
+                try:
+                    self.process.wait(timeout=2)
+                except subprocess.TimeoutExpired:
+                    self.process.kill()
+            self.process = None
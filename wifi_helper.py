@@ -0,0 +1,32 @@
+import json
+import sys
+from wifi_backend import LocalWiFi, WiFiError
+
+# Persistent privileged WiFi helper.
+# Reads one JSON request per line on stdin and answers on stdout:
+#   {"id": 1, "op": "scan_results", "params": {}} -> {"id": 1, "result": [...]}
+OPERATIONS = ('start_scan', 'scan_results', 'connect', 'status', 'configure')
+
+def main():
+    # Responses own stdout; anything printed by the WiFi code goes to stderr
+    output = sys.stdout
+    sys.stdout = sys.stderr
+    wifi = LocalWiFi()
+    for line in sys.stdin:
+        try:
+            request = json.loads(line)
+        except ValueError:
+            continue
+        response = {'id': request.get('id')}
+        op = request.get('op')
+        try:
+            if op not in OPERATIONS:
+                raise WiFiError(f"Unknown operation: {op}")
+            response['result'] = getattr(wifi, op)(**request.get('params', {}))
+        except Exception as e:
+            response['error'] = str(e)
+        output.write(json.dumps(response) + '\n')
+        output.flush()
+
+if __name__ == '__main__':
+    main()